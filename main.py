@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import atexit
 import base64
+import binascii
 import gzip
 import hashlib
 import json
 import os
+import queue
 import re
 import fnmatch
 import secrets
 import socket
 import stat
+import threading
 import time
 import traceback
 import asyncio
@@ -19,11 +23,14 @@ import zipfile
 from io import BytesIO
 import html
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache, partial
+from operator import itemgetter
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 from urllib.parse import urlparse, unquote, quote_plus, urljoin, parse_qsl, urlencode, urlunparse
 from urllib import request as urllib_request
 
@@ -51,10 +58,15 @@ if not HELP_MODE:
     import paramiko
     import psycopg
     from psycopg.rows import dict_row
+    try:
+        from psycopg_pool import ConnectionPool  # type: ignore
+    except Exception:
+        ConnectionPool = None  # type: ignore
 else:
     paramiko = None  # type: ignore
     psycopg = None  # type: ignore
     dict_row = None  # type: ignore
+    ConnectionPool = None  # type: ignore
 
 # Response: 画像/ZIPのダウンロード等で使う
 # - HELP_MODE では fastapi 未インストールでも動くように、まず starlette を試す
@@ -79,6 +91,11 @@ except Exception:
     AuthorizedSession = None  # type: ignore
     google_service_account = None  # type: ignore
 
+try:
+    import orjson  # type: ignore  # NiceGUI の依存で通常は入っている（無ければ標準 json）
+except Exception:
+    orjson = None  # type: ignore
+
 
 
 # =========================
@@ -135,12 +152,29 @@ def now_jst_iso() -> str:
     return datetime.now(JST).replace(microsecond=0).isoformat()
 
 
-def parse_iso_datetime(value: str) -> Optional[datetime]:
-    if not value:
-        return None
+_TODAY_JST: list[tuple[int, str]] = [(-1, "")]  # (日本時間の通算日, "YYYY-MM-DD")。タプルごと差し替えるのでロック不要
+
+
+def today_jst() -> str:
+    """今日の日付（日本時間, YYYY-MM-DD）。日付が変わるまでは作った文字列を使い回す。"""
+    ts = time.time()
+    day = int((ts + 9 * 3600) // 86400)
+    cached_day, text = _TODAY_JST[0]
+    if cached_day != day:
+        text = datetime.fromtimestamp(ts, JST).strftime("%Y-%m-%d")
+        _TODAY_JST[0] = (day, text)
+    return text
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_datetime_cached(value: str) -> Optional[datetime]:
+    # datetime は不変なので、同じ文字列の結果を使い回してよい
     try:
-        v = str(value).strip().replace("Z", "+00:00")
-        dt = datetime.fromisoformat(v)
+        try:
+            # 自分で isoformat() した値がほとんどなので、まずはそのまま読む（3.11+ は末尾 Z も可）
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
         return dt
@@ -148,31 +182,54 @@ def parse_iso_datetime(value: str) -> Optional[datetime]:
         return None
 
 
+def parse_iso_datetime(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    return _parse_iso_datetime_cached(value if isinstance(value, str) else str(value))
+
+
 def to_jst(dt: datetime) -> datetime:
+    if dt.tzinfo is JST:
+        return dt
+    if dt.tzinfo is None:
+        # タイムゾーン無しは UTC とみなす（parse_iso_datetime と同じ扱い）
+        dt = dt.replace(tzinfo=timezone.utc)
     try:
         return dt.astimezone(JST)
-    except Exception:
+    except (OverflowError, ValueError):
+        # 9999-12-31T20:00Z など、JST にすると datetime の範囲外になる値はそのまま返す
         return dt
 
 
+@lru_cache(maxsize=4096)
+def _fmt_jst_text(value: str, fmt: str) -> str:
+    # 一覧や案件カードは同じ ISO 文字列を何度も表示するので、整形結果ごと使い回す
+    dt = parse_iso_datetime(value)
+    if dt:
+        return to_jst(dt).strftime(fmt)
+    return value
+
+
 def fmt_jst(value, fmt: str = "%Y-%m-%d %H:%M") -> str:
     """datetime/ISO文字列を日本時間で表示用フォーマットにする。"""
     if value is None:
         return ""
     if isinstance(value, datetime):
         return to_jst(value).strftime(fmt)
-    dt = parse_iso_datetime(str(value))
-    if dt:
-        return to_jst(dt).strftime(fmt)
-    return str(value)
+    return _fmt_jst_text(value if isinstance(value, str) else str(value), fmt)
+
+
+_URL_MASK_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*://[^\s]+")
 
 
 def sanitize_error_text(text: str) -> str:
     """例外メッセージにURL等が混じっても画面に出さないための簡易マスク。"""
     if not text:
         return ""
-    s = str(text)
-    s = re.sub(r"[a-zA-Z][a-zA-Z0-9+.-]*://[^\s]+", "[REDACTED_URL]", s)
+    s = text if isinstance(text, str) else str(text)
+    # "://" が無ければURLは含まれないので、正規表現は走らせない（大半の例外メッセージはこちら）
+    if "://" in s:
+        s = _URL_MASK_RE.sub("[REDACTED_URL]", s)
     # ついでに長すぎるのも切る
     if len(s) > 300:
         s = s[:300] + "…"
@@ -205,6 +262,11 @@ def _safe_list(value) -> list:
     return [value]
 
 
+def _safe_dict(value) -> dict:
+    """value が dict ならそのまま、それ以外は空 dict（get を2回呼ばずに済むように1回で判定する）。"""
+    return value if isinstance(value, dict) else {}
+
+
 
 def _short_name(name: str, keep: int = 5) -> str:
     """Shorten filename for UI: keep first N chars and add ellipsis."""
@@ -4861,13 +4923,57 @@ def _preview_preflight_error() -> Optional[str]:
 # [BLK-02] Global UI styles (v0.6.4)
 # =========================
 
-def inject_global_styles() -> None:
-    """全ページ共通の見た目（左右分割/カード/選択UI）を安定させるCSS。
-    - flex-wrap だと「ちょっと足りない」時に右が下へ落ちて空白ができやすい
-    - grid + minmax で「入るなら左右、無理なら縦」に安定させる
-    """
+_GLOBAL_HEAD_HTML: Optional[str] = None
+
+# 共通 head の CSS/JS 本体。ファイル名に中身のハッシュを入れるので、変更があれば URL が変わり、長期キャッシュしてよい。
+# ファイル名 -> (media_type, 本体)。ルートは app に1回だけ登録するので、main が2回読み込まれても同じ辞書を使うよう app に持たせる。
+_HEAD_ASSETS: dict[str, tuple[str, bytes]] = getattr(app, "_cvhb_head_assets", None) or {}
+try:
+    app._cvhb_head_assets = _HEAD_ASSETS
+except Exception:
+    pass
+_HEAD_ASSET_MEDIA_TYPES = {"css": "text/css; charset=utf-8", "js": "text/javascript; charset=utf-8"}
+
+
+def _head_asset_url(ext: str, text: str) -> str:
+    body = text.encode("utf-8")
+    name = f"cvhb-{hashlib.blake2b(body, digest_size=8).hexdigest()}.{ext}"
+    _HEAD_ASSETS[name] = (_HEAD_ASSET_MEDIA_TYPES[ext], body)
+    return f"/cvhb_assets/{name}"
+
+
+if not getattr(app, "_cvhb_head_assets_route_added", False):
+
+    @app.get("/cvhb_assets/{name}")
+    def _head_asset_endpoint(name: str):
+        item = _HEAD_ASSETS.get(name)
+        if item is None and _GLOBAL_HEAD_HTML is None:
+            # まだ head を組み立てていないワーカーにも来るので、ここで組み立てて登録する
+            _global_head_html()
+            item = _HEAD_ASSETS.get(name)
+        if item is None:
+            return Response(status_code=404)
+        media_type, body = item
+        return Response(
+            content=body,
+            media_type=media_type,
+            headers={"Cache-Control": "public, max-age=31536000, immutable"},
+        )
+
+    try:
+        app._cvhb_head_assets_route_added = True
+    except Exception:
+        pass
+
+
+def _global_head_html() -> str:
+    """inject_global_styles で head に入れる CSS/JS 一式。初回に1回だけ組み立てて使い回す。"""
+    global _GLOBAL_HEAD_HTML
+    if _GLOBAL_HEAD_HTML is not None:
+        return _GLOBAL_HEAD_HTML
+    parts: list[str] = []
     builder_favicon_href = html.escape(PAGEFLOW_BUILDER_ICON_DATA_URL, quote=True)
-    ui.add_head_html(
+    parts.append(
         """
 <script>
 (function(){
@@ -4880,7 +4986,10 @@ def inject_global_styles() -> None:
 })();
 </script>
 <link id="cvhb-default-favicon" rel="icon" type="image/svg+xml" href="__CVHB_BUILDER_FAVICON__">
-<style id="cvhb-global-styles">
+""".replace("__CVHB_BUILDER_FAVICON__", builder_favicon_href)
+    )
+
+    global_css = """
   /* ====== Page base ====== */
   .cvhb-page {
     background: #f5f5f5;
@@ -5212,6 +5321,42 @@ def inject_global_styles() -> None:
   .cvhb-preview-stage.cvhb-preview-stage-pc {
     min-height: 0;
   }
+  .cvhb-preview-card.cvhb-preview-card-mobile,
+  .cvhb-preview-card.cvhb-preview-card-pc {
+    min-height: 0;
+    height: auto;
+    overflow: hidden;
+    margin: 0 auto;
+  }
+  .cvhb-preview-card.cvhb-preview-card-mobile { width: 100%; border-radius: 22px; }
+  .cvhb-preview-card.cvhb-preview-card-pc { border-radius: 14px; }
+  .cvhb-preview-stage.cvhb-preview-stage-themed {
+    min-height: 0;
+    height: auto;
+    background-image: var(--pv-bg-img);
+    background-color: var(--pv-base-1);
+    background-size: var(--pv-base-size);
+    background-position: var(--pv-base-pos-from, center top);
+    background-repeat: no-repeat;
+    overflow: hidden;
+    contain: paint;
+  }
+  .cvhb-preview-skeleton {
+    display: grid;
+    gap: 14px;
+    padding: 18px;
+  }
+  .cvhb-preview-skeleton-block {
+    border: 1px solid rgba(15,23,42,0.08);
+    background: linear-gradient(180deg, rgba(248,250,252,0.96), rgba(241,245,249,0.92));
+  }
+  .cvhb-preview-skeleton-nav { height: 42px; border-radius: 14px; }
+  .cvhb-preview-skeleton-hero {
+    height: 280px;
+    border-radius: 22px;
+    background: linear-gradient(180deg, rgba(255,255,255,0.98), rgba(241,245,249,0.92));
+  }
+  .cvhb-preview-skeleton-body { height: 132px; border-radius: 18px; }
   .cvhb-loader-scene {
     position: relative;
     width: 220px;
@@ -8313,11 +8458,11 @@ body {
   }
 }
 
-</style>
-""".replace("__CVHB_BUILDER_FAVICON__", builder_favicon_href)
-    )
+"""
 
-    ui.add_head_html(
+    # CSS は3つを元の順番でつないだ1ファイルにして <link> で読む（ブラウザのキャッシュが効き、head に毎回載せない）
+    css_href = _head_asset_url("css", "\n".join((global_css, DEPTH_BG_CSS, SOFT_CLARITY_CSS)))
+    parts.append(
         f"""
 <script>
 (function(){{
@@ -8329,12 +8474,11 @@ body {
   }}catch(e){{}}
 }})();
 </script>
-<style id="cvhb-depth-bg-styles">{DEPTH_BG_CSS}</style>
-<style id="cvhb-soft-clarity-styles">{SOFT_CLARITY_CSS}</style>
+<link id="cvhb-global-styles" rel="stylesheet" href="{css_href}">
 """
     )
 
-    ui.add_head_html(
+    parts.append(
         """
 <script>
 (function(){
@@ -8344,7 +8488,10 @@ body {
   }catch(e){}
 })();
 </script>
-<script id="cvhb-head-behavior-script">
+""",
+    )
+
+    head_js = """
 (function(){
   window.__cvhbHeroIntervals = window.__cvhbHeroIntervals || {};
   window.cvhbInitHeroSlider = function(sliderId, axis, intervalMs){
@@ -9406,7 +9553,6 @@ window.cvhbFitRegister = window.cvhbFitRegister || function(key, outerId, innerI
       root.setAttribute('data-pv-bg-strength', String(payload.bg_strength || 'medium'));
       root.setAttribute('data-pv-bg-motion', String(payload.bg_motion || 'medium'));
       if(fit && payload.fit_style) fit.setAttribute('style', String(payload.fit_style || ''));
-      if(card && payload.frame_style) card.setAttribute('style', String(payload.frame_style || ''));
       window.cvhbPreviewReflow && window.cvhbPreviewReflow(rootId);
       if(payload.design_w){
         window.cvhbFitRegister && window.cvhbFitRegister('pv', fitId || 'pv-fit', rootId, Number(payload.design_w)||860, 0, 0, Number(payload.min_scale)||0.01, Number(payload.max_scale)||1);
@@ -9430,7 +9576,6 @@ window.cvhbFitRegister = window.cvhbFitRegister || function(key, outerId, innerI
       if(card){
         card.classList.toggle('cvhb-preview-card-pc', mode === 'pc');
         card.classList.toggle('cvhb-preview-card-mobile', mode !== 'pc');
-        if(payload.frame_style) card.setAttribute('style', String(payload.frame_style || ''));
       }
       if(fit){
         fit.classList.toggle('cvhb-preview-stage-pc', mode === 'pc');
@@ -9445,9 +9590,26 @@ window.cvhbFitRegister = window.cvhbFitRegister || function(key, outerId, innerI
   };
 
 })();
-</script>
-""",
-    )
+"""
+    # defer/async を付けない（head で同期実行し、ページの JS から呼ぶ関数を先に用意しておく）
+    parts.append(f'<script id="cvhb-head-behavior-script" src="{_head_asset_url("js", head_js)}"></script>\n')
+    _GLOBAL_HEAD_HTML = "\n".join(parts)
+    return _GLOBAL_HEAD_HTML
+
+
+def inject_global_styles() -> None:
+    """全ページ共通の見た目（左右分割/カード/選択UI）を安定させるCSS。
+    - flex-wrap だと「ちょっと足りない」時に右が下へ落ちて空白ができやすい
+    - grid + minmax で「入るなら左右、無理なら縦」に安定させる
+    """
+    # 同じクライアントに2回目を入れない（描画後だと JS で head に挿し直すことになるため）
+    try:
+        if app.storage.client.get("cvhb_global_styles_injected"):
+            return
+        app.storage.client["cvhb_global_styles_injected"] = True
+    except Exception:
+        pass
+    ui.add_head_html(_global_head_html())
 # =========================
 # [BLK-03] Config
 # =========================
@@ -9459,7 +9621,7 @@ def read_text_file(path: str, default: str = "") -> str:
         return default
 
 
-VERSION = read_text_file("VERSION", "1.9.17")
+VERSION = read_text_file(str(Path(__file__).with_name("VERSION")), "1.9.17")
 
 
 def detect_file_version(path: str) -> str:
@@ -9572,6 +9734,8 @@ SFTP_PROJECTS_DIR = f"{SFTP_BASE_DIR}/projects"
 # [BLK-01] Small utils
 # =========================
 
+# 同じ案件の住所でプレビューが何度も描き直されるので、URLエンコード結果を使い回す
+@lru_cache(maxsize=256)
 def google_maps_url(address: str) -> str:
     address = (address or "").strip()
     if not address:
@@ -9579,18 +9743,69 @@ def google_maps_url(address: str) -> str:
     return f"https://www.google.com/maps/search/?api=1&query={quote_plus(address)}"
 
 
+@lru_cache(maxsize=256)
+def google_maps_embed_url(address: str) -> str:
+    """iframe 用（search API の URL は iframe だと表示されない場合がある）。"""
+    address = (address or "").strip()
+    if not address:
+        return ""
+    return f"https://www.google.com/maps?q={quote_plus(address)}&output=embed"
+
+
 # =========================
 # [BLK-04] DB helpers
 # =========================
 
-def db_connect() -> psycopg.Connection:
+DB_POOL_MIN_SIZE = max(1, _env_int("CVHB_DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = max(DB_POOL_MIN_SIZE, _env_int("CVHB_DB_POOL_MAX_SIZE", 10))
+DB_POOL_MAX_IDLE_SEC = max(30.0, _env_float("CVHB_DB_POOL_MAX_IDLE_SEC", 240.0))
+# プールで接続が使い回されるので、同じSQLは初回からサーバー側 prepared statement にして解析・計画を省く。
+# PgBouncer(transaction) 経由などで使えない場合は負の値で無効化する。
+_db_prepare_threshold_raw = _env_int("CVHB_DB_PREPARE_THRESHOLD", 1)
+DB_PREPARE_THRESHOLD: Optional[int] = None if _db_prepare_threshold_raw < 0 else _db_prepare_threshold_raw
+
+_DB_POOL = None
+_DB_POOL_LOCK = threading.Lock()
+
+
+def _db_pool():
+    """接続プール（初回利用時に1つだけ作る）。psycopg_pool が無ければ None。"""
+    global _DB_POOL
+    if _DB_POOL is not None:
+        return _DB_POOL
+    if ConnectionPool is None:
+        return None
+    with _DB_POOL_LOCK:
+        if _DB_POOL is None:
+            pool = ConnectionPool(
+                DATABASE_URL,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                max_idle=DB_POOL_MAX_IDLE_SEC,
+                kwargs={"sslmode": "require", "autocommit": True, "prepare_threshold": DB_PREPARE_THRESHOLD},
+                open=True,
+            )
+            atexit.register(pool.close)
+            _DB_POOL = pool
+    return _DB_POOL
+
+
+@contextmanager
+def db_connect():
+    """DB接続を1本借りる。毎回 TLS 接続し直さないよう、プールがあればそこから借りて返す。"""
     if psycopg is None:
         raise RuntimeError("DBが利用できません（psycopg未インストール or HELP_MODE）")
     if not DATABASE_URL:
         raise RuntimeError("DBが利用できません（DATABASE_URL が空です）")
-    conn = psycopg.connect(DATABASE_URL, sslmode="require")
-    conn.autocommit = True
-    return conn
+    pool = _db_pool()
+    if pool is None:
+        conn = psycopg.connect(DATABASE_URL, sslmode="require")
+        conn.autocommit = True
+        with conn:
+            yield conn
+        return
+    with pool.connection() as conn:
+        yield conn
 
 
 def db_execute(sql: str, params: Optional[tuple] = None) -> None:
@@ -9599,86 +9814,194 @@ def db_execute(sql: str, params: Optional[tuple] = None) -> None:
             cur.execute(sql, params)
 
 
+def db_execute_script(statements: "tuple[str, ...] | list[str]") -> None:
+    """パラメータ無しの SQL（DDL など）を1本の接続で順に流す。パイプラインが使えれば往復は1回。"""
+    with db_connect() as conn:
+        with conn.cursor() as cur:
+            if psycopg is not None and psycopg.Pipeline.is_supported():
+                with conn.pipeline():
+                    for sql in statements:
+                        cur.execute(sql, prepare=False)
+            else:
+                for sql in statements:
+                    cur.execute(sql, prepare=False)
+
+
 def db_fetchone(sql: str, params: Optional[tuple] = None) -> Optional[dict]:
     with db_connect() as conn:
         with conn.cursor(row_factory=dict_row) as cur:
             cur.execute(sql, params)
-            row = cur.fetchone()
-            return dict(row) if row else None
+            return cur.fetchone()
 
 
 def _db_fetchall__base_5742(sql: str, params: Optional[tuple] = None) -> list[dict]:
     with db_connect() as conn:
         with conn.cursor(row_factory=dict_row) as cur:
             cur.execute(sql, params)
-            rows = cur.fetchall()
-            return [dict(r) for r in rows]
+            # dict_row の行はすでに dict なので、コピーせずそのまま返す
+            return cur.fetchall()
 # canonical alias retained for staged override compatibility
 db_fetchall = _db_fetchall__base_5742
 
 
 
+DB_BASE_SCHEMA_SQL: tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id BIGSERIAL PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS audit_logs (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NULL REFERENCES users(id),
+        username TEXT NULL,
+        role TEXT NULL,
+        action TEXT NOT NULL,
+        details TEXT NOT NULL DEFAULT '{}',
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """,
+    # 操作ログ画面のキーセット（ORDER BY created_at DESC, id DESC）を索引だけで読めるよう id まで含める
+    "CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_id ON audit_logs(created_at DESC, id DESC);",
+    "DROP INDEX IF EXISTS idx_audit_logs_created_at;",
+)
+
+
 def _init_db_schema__base_5750() -> None:
-    db_execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id BIGSERIAL PRIMARY KEY,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT NOT NULL,
-            is_active BOOLEAN NOT NULL DEFAULT TRUE,
-            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        """
-    )
-    db_execute(
-        """
-        CREATE TABLE IF NOT EXISTS audit_logs (
-            id BIGSERIAL PRIMARY KEY,
-            user_id BIGINT NULL REFERENCES users(id),
-            username TEXT NULL,
-            role TEXT NULL,
-            action TEXT NOT NULL,
-            details TEXT NOT NULL DEFAULT '{}',
-            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        """
-    )
-    db_execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at ON audit_logs(created_at DESC);")
+    db_execute_script(DB_BASE_SCHEMA_SQL)
 # canonical alias retained for staged override compatibility
 init_db_schema = _init_db_schema__base_5750
 
 
 
 # =========================
-# Password hashing (PBKDF2)
+# Password hashing (scrypt / 旧形式 PBKDF2)
 # =========================
+# 新規・変更時は scrypt（OpenSSL実装・メモリハード）で保存する。
+# 旧形式 pbkdf2_sha256 も検証でき、ログイン成功時に scrypt へ置き換える。
+
+PASSWORD_SCRYPT_N = 16384
+PASSWORD_SCRYPT_R = 8
+PASSWORD_SCRYPT_P = 1
+PASSWORD_SCRYPT_DKLEN = 32
+
+# 保存形式: "<algo>$<params>$<salt(base64)>$<hash(base64)>"（検証のたびに split / dict を作らない）
+_STORED_PASSWORD_RE = re.compile(r"^(scrypt|pbkdf2_sha256)\$([^$]+)\$([^$]+)\$([^$]+)$")
+_SCRYPT_PARAMS_RE = re.compile(r"^n=(\d+),r=(\d+),p=(\d+)$")
+
 
 def hash_password(password: str) -> str:
     salt = secrets.token_bytes(16)
-    iterations = 210_000
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
-    return "pbkdf2_sha256${}${}${}".format(
-        iterations,
+    dk = hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=PASSWORD_SCRYPT_N,
+        r=PASSWORD_SCRYPT_R,
+        p=PASSWORD_SCRYPT_P,
+        dklen=PASSWORD_SCRYPT_DKLEN,
+    )
+    return "scrypt$n={},r={},p={}${}${}".format(
+        PASSWORD_SCRYPT_N,
+        PASSWORD_SCRYPT_R,
+        PASSWORD_SCRYPT_P,
         base64.b64encode(salt).decode("utf-8"),
         base64.b64encode(dk).decode("utf-8"),
     )
 
 
-def verify_password(password: str, stored: str) -> bool:
+@lru_cache(maxsize=256)
+def _parse_stored_password(stored: str) -> Optional[tuple[str, tuple[int, ...], bytes, bytes]]:
+    """保存ハッシュを (algo, 数値パラメータ, salt, hash) に分解する。同じ保存ハッシュは解析し直さない。"""
+    m = _STORED_PASSWORD_RE.match(stored)
+    if not m:
+        return None
+    algo, params, b64_salt, b64_hash = m.groups()
     try:
-        algo, iters, b64_salt, b64_hash = stored.split("$", 3)
-        if algo != "pbkdf2_sha256":
-            return False
-        iterations = int(iters)
-        salt = base64.b64decode(b64_salt.encode("utf-8"))
-        expected = base64.b64decode(b64_hash.encode("utf-8"))
-        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+        salt = binascii.a2b_base64(b64_salt)
+        expected = binascii.a2b_base64(b64_hash)
+    except (binascii.Error, ValueError):
+        return None
+    if algo == "scrypt":
+        pm = _SCRYPT_PARAMS_RE.match(params)
+        if not pm:
+            return None
+        nums = tuple(int(x) for x in pm.groups())
+    elif params.isdigit():
+        nums = (int(params),)
+    else:
+        return None
+    return algo, nums, salt, expected
+
+
+def _verify_password_uncached(password: str, stored: str) -> bool:
+    parsed = _parse_stored_password(stored or "")
+    if parsed is None:
+        return False
+    algo, nums, salt, expected = parsed
+    try:
+        if algo == "scrypt":
+            n, r, p = nums
+            dk = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, dklen=len(expected))
+        else:
+            dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, nums[0])
         return secrets.compare_digest(dk, expected)
     except Exception:
         return False
 
 
+def password_needs_rehash(stored: str) -> bool:
+    """旧形式（PBKDF2など）で保存されていれば True。"""
+    return not str(stored or "").startswith("scrypt$")
+
+
+def upgrade_password_hash(user_id: int, password: str, stored: str) -> None:
+    """ログイン成功時に旧形式のハッシュを scrypt へ置き換える（同時更新があれば何もしない）。"""
+    db_execute(
+        "UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s",
+        (hash_password(password), int(user_id), str(stored or "")),
+    )
+
+
+# 同じ (パスワード, 保存ハッシュ) の再検証で重いハッシュ計算（scrypt / PBKDF2）を繰り返さないためのキャッシュ。
+# 平文は保持せず、プロセスごとの秘密鍵付き blake2b ダイジェストだけをキーにする。
+# 保存ハッシュ（ソルト込み）がキーに入るので、パスワード変更後は自然に別キーになる。
+_PASSWORD_VERIFY_CACHE: "OrderedDict[tuple[bytes, str], bool]" = OrderedDict()
+_PASSWORD_VERIFY_CACHE_MAX = 512
+_PASSWORD_VERIFY_CACHE_KEY = secrets.token_bytes(32)
+
+
+def verify_password(password: str, stored: str) -> bool:
+    try:
+        pw_key = hashlib.blake2b(password.encode("utf-8"), key=_PASSWORD_VERIFY_CACHE_KEY, digest_size=16).digest()
+        key = (pw_key, str(stored))
+    except Exception:
+        return False
+    cached = _PASSWORD_VERIFY_CACHE.get(key)
+    if cached is not None:
+        try:
+            _PASSWORD_VERIFY_CACHE.move_to_end(key)
+        except Exception:
+            pass
+        return cached
+    ok = _verify_password_uncached(password, stored)
+    # 失敗は覚えない（総当たりには毎回重い計算をさせ、間違いの連打で正解のキャッシュが押し出されないように）
+    if not ok:
+        return False
+    if len(_PASSWORD_VERIFY_CACHE) >= _PASSWORD_VERIFY_CACHE_MAX:
+        try:
+            _PASSWORD_VERIFY_CACHE.popitem(last=False)
+        except Exception:
+            _PASSWORD_VERIFY_CACHE.clear()
+    _PASSWORD_VERIFY_CACHE[key] = True
+    return True
+
+
 # =========================
 # [BLK-05] Users / Auth
 # =========================
@@ -9713,6 +10036,27 @@ def count_users() -> int:
     return int(row["cnt"]) if row else 0
 
 
+# 「ユーザー0人」は初回セットアップ前だけの状態なので、いったん存在を確認したら以後はDBに聞かない。
+_HAS_USERS = False
+
+
+def any_users_exist() -> bool:
+    global _HAS_USERS
+    if _HAS_USERS:
+        return True
+    try:
+        row = db_fetchone("SELECT EXISTS (SELECT 1 FROM users) AS has_users", None)
+    except Exception as e:
+        try:
+            print(f"[users] any_users_exist failed: {sanitize_error_text(e)}", flush=True)
+        except Exception:
+            pass
+        # count_users と同じく安全側（既存ユーザーあり）に倒す。ただし確認できていないのでラッチはしない。
+        return True
+    _HAS_USERS = bool(row and row.get("has_users"))
+    return _HAS_USERS
+
+
 def _create_user__base_5828(username: str, password: str, role: str) -> None:
     pw_hash = hash_password(password)
     db_execute(
@@ -9921,20 +10265,21 @@ def cleanup_user_storage() -> None:
         pass
 
 
+# NiceGUI のバージョンで遷移APIが違う（新: ui.navigate.to / 旧: ui.open）ので、起動時に一度だけ決めておく
+_NAVIGATE_FN = getattr(getattr(ui, "navigate", None), "to", None) or getattr(ui, "open", None)
+
+
 def navigate_to(path: str) -> None:
-    safe_path = (path or "/").replace("'", "\'")
-    try:
-        ui.navigate.to(path)
-        return
-    except Exception:
-        pass
-    try:
-        ui.open(path)
-        return
-    except Exception:
-        pass
+    target = path or "/"
+    if _NAVIGATE_FN is not None:
+        try:
+            _NAVIGATE_FN(target)
+            return
+        except Exception:
+            pass
     try:
-        ui.run_javascript(f"window.location.href='{safe_path}'")
+        # json.dumps で JS 文字列としてエスケープする（引用符や改行を含むパスでも壊れない）
+        ui.run_javascript(f"window.location.href={json.dumps(target)}")
     except Exception:
         pass
 
@@ -10123,10 +10468,89 @@ def log_project_open_timing(
 # [BLK-05] Session / Project state (avoid storing big dict in cookie)
 # =========================
 
-PROJECT_CACHE: dict[int, dict] = {}
+class _LruTtlCache:
+    """件数上限 + 最終アクセスからの期限つきの小さな dict 代わり（get / [] / pop / in だけ対応）。
+
+    ログアウトせずに閉じたセッションの分が残り続けないよう、古いものから自動で捨てる。
+    mark_dirty() したキー（未保存の編集を持つ案件）は、mark_clean() / pop() されるまで期限切れでも件数超過でも捨てない。
+    """
+
+    def __init__(self, maxsize: int, ttl_sec: float) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.ttl_sec = float(ttl_sec)
+        self._items: "OrderedDict[object, tuple[float, object]]" = OrderedDict()
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is None:
+                return default
+            if now - hit[0] > self.ttl_sec and key not in self._dirty:
+                del self._items[key]
+                return default
+            self._items[key] = (now, hit[1])
+            self._items.move_to_end(key)
+            return hit[1]
+
+    def __getitem__(self, key):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxsize:
+                for old in list(self._items):
+                    if len(self._items) <= self.maxsize:
+                        break
+                    if old != key and old not in self._dirty:
+                        del self._items[old]
+
+    def mark_dirty(self, key) -> None:
+        with self._lock:
+            if key in self._items:
+                self._dirty.add(key)
+
+    def mark_clean(self, key) -> None:
+        with self._lock:
+            self._dirty.discard(key)
+
+    def __contains__(self, key) -> bool:
+        missing = object()
+        return self.get(key, missing) is not missing
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            hit = self._items.pop(key, None)
+            self._dirty.discard(key)
+        return default if hit is None else hit[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._dirty.clear()
+
+
+_PROJECT_CACHE_MAX = max(50, _env_int("CVHB_PROJECT_CACHE_MAX", 1024))
+_PROJECT_CACHE_TTL_SEC = max(60.0, _env_float("CVHB_PROJECT_CACHE_TTL_SEC", 3600.0))
+# user.id -> 編集中の案件 dict
+PROJECT_CACHE = _LruTtlCache(_PROJECT_CACHE_MAX, _PROJECT_CACHE_TTL_SEC)
 PROJECT_LOAD_CACHE: "OrderedDict[str, dict]" = OrderedDict()
 _PROJECT_LOAD_CACHE_MAX = max(20, int(_env_float("CVHB_PROJECT_LOAD_CACHE_MAX", 100.0)))
 _PROJECT_LIST_CACHE: dict[str, object] = {"ts": 0.0, "items": []}
+# 案件ディレクトリ名 -> ((st_mtime, st_size), 一覧用メタ)。一覧の TTL 切れ後も、更新の無い案件は再読込しない
+_PROJECT_INDEX_CACHE: dict[str, tuple[tuple[int, int], dict]] = {}
 _COMPANY_LIST_CACHE_TTL_SEC = max(10.0, _env_float("CVHB_COMPANY_LIST_CACHE_TTL_SEC", 45.0))
 _COMPANY_LIST_CACHE: dict[str, dict] = {}
 _TENANT_SCOPE_COMPANY_OPTIONS_CACHE_TTL_SEC = max(5.0, _env_float("CVHB_TENANT_SCOPE_COMPANY_OPTIONS_TTL_SEC", 30.0))
@@ -10207,9 +10631,28 @@ def _tenant_scope_company_options_cache_invalidate() -> None:
     _TENANT_SCOPE_COMPANY_OPTIONS_CACHE.clear()
 
 
+def _json_dumps_compact(value) -> str:
+    """project.json 用の詰めた JSON 文字列（orjson があればそちらで高速に作る）。"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except Exception:
+            pass  # 64bit を超える int など orjson が扱えない値は標準 json に任せる
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_loads(text):
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except Exception:
+            pass  # NaN など標準 json だけが読める表記もあるので、判定は標準 json に任せる
+    return json.loads(text)
+
+
 def _clone_json_data(value):
     try:
-        return json.loads(json.dumps(value, ensure_ascii=False))
+        return _json_loads(_json_dumps_compact(value))
     except Exception:
         return value
 
@@ -10320,9 +10763,13 @@ def _project_list_cache_put(items: list[dict]) -> None:
     _PROJECT_LIST_CACHE["items"] = _clone_json_data(items or [])
 
 
-def _project_list_cache_invalidate() -> None:
+def _project_list_cache_invalidate(project_id: str = "") -> None:
     _PROJECT_LIST_CACHE["ts"] = 0.0
     _PROJECT_LIST_CACHE["items"] = []
+    pid = str(project_id or "").strip()
+    if pid:
+        # SFTP の mtime は秒単位なので、同じ秒・同じサイズの上書きでも取りこぼさないよう明示的に捨てる
+        _PROJECT_INDEX_CACHE.pop(pid, None)
 
 
 def _project_list_cache_get_stale() -> list[dict]:
@@ -10372,13 +10819,15 @@ def clear_current_project(user: Optional[User]) -> None:
 def logout() -> None:
     u = current_user()
     if u:
-        safe_log_action(u, "logout")
         clear_current_project(u)
     app.storage.user.clear()
     try:
         ui.run_javascript(clear_client_sensitive_storage_script("/"))
     except Exception:
         navigate_to("/")
+    # 監査ログは遷移を出したあとにキューへ積むだけ（書き込みはバックグラウンド）
+    if u:
+        safe_log_action(u, "logout")
 
 
 def _ensure_stg_test_users__base_6212() -> tuple[bool, str]:
@@ -10401,7 +10850,10 @@ ensure_stg_test_users = _ensure_stg_test_users__base_6212
 # [BLK-06] SFTP (SFTP To Go)
 # =========================
 
+@lru_cache(maxsize=8)
 def parse_sftp_url(url: str) -> tuple[str, int, str, str]:
+    # SFTPTOGO_URL は起動中に変わらないので、接続のたびに urlparse / unquote し直さない
+    # （不正なURLは例外のままにして、起動ではなく最初のSFTP利用時にエラーを出す）
     u = urlparse(url)
     if u.scheme not in {"sftp"}:
         raise RuntimeError("SFTPTOGO_URL の scheme が sftp ではありません")
@@ -10414,7 +10866,23 @@ def parse_sftp_url(url: str) -> tuple[str, int, str, str]:
     return host, port, user, pwd
 
 
-def _open_sftp_client_once() -> tuple["paramiko.Transport", "paramiko.SFTPClient"]:
+SFTP_WINDOW_SIZE = 4 * 1024 * 1024  # 大きめの受信ウィンドウで往復待ちを減らす
+SFTP_MAX_PACKET_SIZE = 32768
+
+# SSHの接続・鍵交換・認証は重いので、Transport は1本を使い回す。
+# 操作ごとに開くのは軽い SFTP チャネルだけ（スレッドごとに別チャネルなので並行利用も安全）。
+_SFTP_TRANSPORT: Optional["paramiko.Transport"] = None
+_SFTP_TRANSPORT_LOCK = threading.Lock()
+
+# 使い終わった SFTP チャネルも少しだけ取っておき、次の操作で開き直しの往復を省く。
+# サーバー側の同時チャネル数上限（OpenSSH の MaxSessions など）に当たらないよう、置いておく数は小さく抑える。
+SFTP_IDLE_CHANNELS = max(0, _env_int("CVHB_SFTP_IDLE_CHANNELS", 4))
+SFTP_CHANNEL_IDLE_SEC = max(5.0, _env_float("CVHB_SFTP_CHANNEL_IDLE_SEC", 60.0))
+_SFTP_IDLE_CLIENTS: list[tuple["paramiko.SFTPClient", float]] = []  # (client, 返却時刻)
+_SFTP_IDLE_LOCK = threading.Lock()
+
+
+def _open_sftp_transport_once() -> "paramiko.Transport":
     if paramiko is None:
         raise RuntimeError("paramiko が未インストールです（SFTPが使えません）")
     host, port, user, pwd = parse_sftp_url(SFTPTOGO_URL)
@@ -10424,7 +10892,11 @@ def _open_sftp_client_once() -> tuple["paramiko.Transport", "paramiko.SFTPClient
     except Exception:
         pass
 
-    transport = paramiko.Transport(sock)
+    transport = paramiko.Transport(
+        sock,
+        default_window_size=SFTP_WINDOW_SIZE,
+        default_max_packet_size=SFTP_MAX_PACKET_SIZE,
+    )
     try:
         try:
             transport.banner_timeout = float(SFTP_CONNECT_TIMEOUT_SEC)
@@ -10439,21 +10911,145 @@ def _open_sftp_client_once() -> tuple["paramiko.Transport", "paramiko.SFTPClient
             transport.set_keepalive(int(SFTP_KEEPALIVE_SEC))
         except Exception:
             pass
-        sftp = paramiko.SFTPClient.from_transport(transport)
+        return transport
+    except Exception:
         try:
-            ch = sftp.get_channel()
-            ch.settimeout(float(SFTP_IO_TIMEOUT_SEC))
+            transport.close()
         except Exception:
             pass
-        return transport, sftp
+        raise
+
+
+def _close_shared_sftp_transport() -> None:
+    global _SFTP_TRANSPORT
+    with _SFTP_IDLE_LOCK:
+        idle = [c for c, _ in _SFTP_IDLE_CLIENTS]
+        _SFTP_IDLE_CLIENTS.clear()
+    for c in idle:
+        try:
+            c.close()
+        except Exception:
+            pass
+    with _SFTP_TRANSPORT_LOCK:
+        t = _SFTP_TRANSPORT
+        _SFTP_TRANSPORT = None
+    if t is not None:
+        try:
+            t.close()
+        except Exception:
+            pass
+
+
+atexit.register(_close_shared_sftp_transport)
+
+
+def _shared_sftp_transport() -> "paramiko.Transport":
+    """使い回し用の Transport を返す。切れているときだけ張り直す。
+
+    チャネルが1本開けなかった（MaxSessions 上限など）だけでは張り直さない。
+    生きている Transport を閉じると、他スレッドが使用中のチャネルまで全部切れてしまうため。
+    """
+    global _SFTP_TRANSPORT
+    with _SFTP_TRANSPORT_LOCK:
+        t = _SFTP_TRANSPORT
+        if t is not None:
+            try:
+                if t.is_active() and t.is_authenticated():
+                    return t
+            except Exception:
+                pass
+        if t is not None:
+            try:
+                t.close()
+            except Exception:
+                pass
+        _SFTP_TRANSPORT = None
+        t = _open_sftp_transport_once()
+        _SFTP_TRANSPORT = t
+        return t
+
+
+def _open_sftp_client_once() -> "paramiko.SFTPClient":
+    transport = _shared_sftp_transport()
+    sftp = paramiko.SFTPClient.from_transport(transport)
+    if sftp is None:
+        raise RuntimeError("SFTPチャネルを開けませんでした")
+    try:
+        ch = sftp.get_channel()
+        ch.settimeout(float(SFTP_IO_TIMEOUT_SEC))
     except Exception:
+        pass
+    return sftp
+
+
+def _take_idle_sftp_client() -> Optional["paramiko.SFTPClient"]:
+    """取っておいたチャネルのうち、今の Transport 上でまだ生きているものを1つ返す。"""
+    stale: list["paramiko.SFTPClient"] = []
+    found = None
+    now = time.monotonic()
+    with _SFTP_IDLE_LOCK:
+        while _SFTP_IDLE_CLIENTS:
+            sftp, released_at = _SFTP_IDLE_CLIENTS.pop()
+            try:
+                ch = sftp.get_channel()
+                usable = (
+                    now - released_at <= SFTP_CHANNEL_IDLE_SEC
+                    and ch is not None
+                    and not ch.closed
+                    and ch.get_transport() is _SFTP_TRANSPORT
+                    and _SFTP_TRANSPORT.is_active()
+                )
+            except Exception:
+                usable = False
+            if usable:
+                found = sftp
+                break
+            stale.append(sftp)
+    for c in stale:
         try:
-            transport.close()
+            c.close()
         except Exception:
             pass
+    return found
+
+
+def _sftp_note_io_error(sftp: "paramiko.SFTPClient", exc: BaseException) -> None:
+    """読み書きの途中でタイムアウト・切断などがあったチャネルに「使い回し不可」の印を付ける。
+
+    呼び出し側が例外を握りつぶしても、パケットの途中で止まったチャネルをプールへ戻さないため。
+    ファイル無し・権限などの SFTP ステータス応答（OSError）はストリームが壊れていないので対象外。
+    """
+    if isinstance(exc, OSError) and not isinstance(exc, (TimeoutError, ConnectionError)):
+        return
+    try:
+        sftp._cvhb_unreusable = True
+    except Exception:
+        pass
+
+
+@contextmanager
+def _sftp_io_guard(sftp: "paramiko.SFTPClient"):
+    try:
+        yield
+    except BaseException as e:
+        _sftp_note_io_error(sftp, e)
         raise
 
 
+def _release_sftp_client(sftp: "paramiko.SFTPClient", *, reusable: bool) -> None:
+    if reusable and getattr(sftp, "_cvhb_unreusable", False):
+        reusable = False
+    if reusable and SFTP_IDLE_CHANNELS > 0:
+        with _SFTP_IDLE_LOCK:
+            if len(_SFTP_IDLE_CLIENTS) < SFTP_IDLE_CHANNELS:
+                _SFTP_IDLE_CLIENTS.append((sftp, time.monotonic()))
+                return
+    try:
+        sftp.close()
+    except Exception:
+        pass
+
+
 @contextmanager
 def sftp_client():
     # HELP_MODE: ローカルでのヘルプ作成は「完全オフライン」を想定するためSFTPは使わない
@@ -10464,77 +11060,120 @@ def sftp_client():
     if not SFTPTOGO_URL:
         raise RuntimeError("SFTPTOGO_URL が未設定です")
 
-    transport = None
-    sftp = None
+    sftp = _take_idle_sftp_client()
     last_error: Optional[Exception] = None
 
-    for attempt in range(1, int(SFTP_RETRY_COUNT) + 1):
-        try:
-            transport, sftp = _open_sftp_client_once()
-            break
-        except Exception as e:
-            last_error = e
-            if attempt >= int(SFTP_RETRY_COUNT):
-                break
+    if sftp is None:
+        for attempt in range(1, int(SFTP_RETRY_COUNT) + 1):
             try:
-                print(
-                    f"[sftp] connect retry {attempt}/{int(SFTP_RETRY_COUNT)}: {sanitize_error_text(e)}",
-                    flush=True,
-                )
-            except Exception:
-                pass
-            time.sleep(min(2.0, 0.4 * attempt))
+                # Transport が切れていればここで張り直される（生きていれば使い回したままチャネルだけ開き直す）
+                sftp = _open_sftp_client_once()
+                break
+            except Exception as e:
+                last_error = e
+                if attempt >= int(SFTP_RETRY_COUNT):
+                    break
+                try:
+                    print(
+                        f"[sftp] connect retry {attempt}/{int(SFTP_RETRY_COUNT)}: {sanitize_error_text(e)}",
+                        flush=True,
+                    )
+                except Exception:
+                    pass
+                time.sleep(min(2.0, 0.4 * attempt))
 
-    if sftp is None or transport is None:
+    if sftp is None:
         raise RuntimeError(f"SFTP接続に失敗しました: {sanitize_error_text(last_error or 'unknown error')}")
 
+    ok = False
     try:
         yield sftp
+        ok = True
     finally:
-        try:
-            sftp.close()
-        except Exception:
-            pass
-        try:
-            transport.close()
-        except Exception:
-            pass
+        # 正常に終わったチャネルは次の操作用に取っておく（失敗したものは閉じる。Transport は使い回す）
+        _release_sftp_client(sftp, reusable=ok)
+
+
+# アプリ用SFTP（SFTPTOGO_URL）上で「あると確認済み」のディレクトリ。
+# 保存のたびに projects/<id> までの各階層を stat し直す往復を省く（公開先SFTPなど別サーバーには使わない）。
+_SFTP_DIRS_KNOWN: set[str] = set()
+
+
+def _sftp_uses_app_storage(sftp: paramiko.SFTPClient) -> bool:
+    try:
+        return sftp.get_channel().get_transport() is _SFTP_TRANSPORT
+    except Exception:
+        return False
+
+
+def _sftp_forget_dirs(remote_dir: str) -> None:
+    """remote_dir とその配下を「確認済み」から外す（削除時・書き込み失敗時）。"""
+    remote_dir = remote_dir.rstrip("/")
+    prefix = remote_dir + "/"
+    # list() で写してから回す（他スレッドの add と競合しても "changed size during iteration" にならない）
+    for known in list(_SFTP_DIRS_KNOWN):
+        if known == remote_dir or known.startswith(prefix):
+            _SFTP_DIRS_KNOWN.discard(known)
 
 
 def sftp_mkdirs(sftp: paramiko.SFTPClient, remote_dir: str) -> None:
     remote_dir = remote_dir.rstrip("/")
     if remote_dir == "":
         return
+    remember = _sftp_uses_app_storage(sftp)
+    if remember and f"/{remote_dir.strip('/')}" in _SFTP_DIRS_KNOWN:
+        return
     parts = remote_dir.strip("/").split("/")
     path = ""
     for p in parts:
         path = f"{path}/{p}"
+        if remember and path in _SFTP_DIRS_KNOWN:
+            continue
         try:
-            sftp.stat(path)
+            with _sftp_io_guard(sftp):
+                sftp.stat(path)
         except Exception:
             try:
-                sftp.mkdir(path)
+                with _sftp_io_guard(sftp):
+                    sftp.mkdir(path)
             except Exception:
-                pass
+                continue
+        if remember:
+            _SFTP_DIRS_KNOWN.add(path)
 
 
-def sftp_write_text(sftp: paramiko.SFTPClient, remote_path: str, text: str) -> None:
+def _sftp_open_for_write(sftp: paramiko.SFTPClient, remote_path: str, mode: str):
     remote_dir = "/".join(remote_path.split("/")[:-1])
     sftp_mkdirs(sftp, remote_dir)
-    with sftp.open(remote_path, "w") as f:
+    try:
+        return sftp.open(remote_path, mode)
+    except FileNotFoundError:
+        # 別プロセスでディレクトリが消された可能性がある：どの階層が消えたか分からないので、
+        # 途中の階層もすべて確認済みから外して作り直す
+        path = ""
+        for p in remote_dir.strip("/").split("/"):
+            path = f"{path}/{p}"
+            _SFTP_DIRS_KNOWN.discard(path)
+        sftp_mkdirs(sftp, remote_dir)
+        return sftp.open(remote_path, mode)
+
+
+def sftp_write_text(sftp: paramiko.SFTPClient, remote_path: str, text: str) -> None:
+    with _sftp_io_guard(sftp), _sftp_open_for_write(sftp, remote_path, "w") as f:
+        # 書き込みごとの応答待ちをせず、まとめて送る（エラーは close 時に検出される）
+        f.set_pipelined(True)
         f.write(text)
 
 
 def sftp_write_bytes(sftp: paramiko.SFTPClient, remote_path: str, data: bytes) -> None:
     """SFTPにバイナリを書き込む（ZIPなど）。"""
-    remote_dir = "/".join(remote_path.split("/")[:-1])
-    sftp_mkdirs(sftp, remote_dir)
-    with sftp.open(remote_path, "wb") as f:
+    with _sftp_io_guard(sftp), _sftp_open_for_write(sftp, remote_path, "wb") as f:
+        f.set_pipelined(True)
         f.write(data or b"")
 
 
 def sftp_read_text(sftp: paramiko.SFTPClient, remote_path: str) -> str:
-    with sftp.open(remote_path, "r") as f:
+    with _sftp_io_guard(sftp), sftp.open(remote_path, "r") as f:
         body = f.read()
         if isinstance(body, bytes):
             return body.decode("utf-8", errors="replace")
@@ -10543,13 +11182,14 @@ def sftp_read_text(sftp: paramiko.SFTPClient, remote_path: str) -> str:
 
 def sftp_read_bytes(sftp: paramiko.SFTPClient, remote_path: str) -> bytes:
     """SFTPからバイナリを読み込む（ZIPなど）。"""
-    with sftp.open(remote_path, "rb") as f:
+    with _sftp_io_guard(sftp), sftp.open(remote_path, "rb") as f:
         return f.read()
 
 
 def sftp_list_dirs(sftp: paramiko.SFTPClient, remote_dir: str) -> list[str]:
     try:
-        items = sftp.listdir_attr(remote_dir)
+        with _sftp_io_guard(sftp):
+            items = sftp.listdir_attr(remote_dir)
     except Exception:
         return []
     dirs = []
@@ -10566,6 +11206,7 @@ def sftp_rmtree(sftp: paramiko.SFTPClient, remote_dir: str) -> None:
     # Safety: projectsディレクトリ配下だけ許可
     if not remote_dir.startswith(SFTP_PROJECTS_DIR.rstrip("/") + "/"):
         raise ValueError("unsafe delete path")
+    _sftp_forget_dirs(f"/{remote_dir.strip('/')}")
     try:
         for it in sftp.listdir_attr(remote_dir):
             p = f"{remote_dir}/{it.filename}"
@@ -10603,8 +11244,9 @@ def _delete_project_from_sftp__base_6416(project_id: str, user: Optional[User])
         sftp_rmtree(sftp, remote_dir)
 
     # 案件一覧・案件本文キャッシュを無効化（削除が即反映されるように）
-    _project_list_cache_invalidate()
+    _project_list_cache_invalidate(pid)
     _project_load_cache_invalidate(pid)
+    _PROJECT_IMAGES_META_SIG.pop(pid, None)
 
     if user:
         safe_log_action(user, "project_delete", details=json.dumps({"project_id": pid}, ensure_ascii=False))
@@ -10640,6 +11282,8 @@ INDUSTRY_PRESETS = [
     },
 ]
 INDUSTRY_OPTIONS = [x["value"] for x in INDUSTRY_PRESETS]
+# 表示順は INDUSTRY_OPTIONS（list）を使い、存在チェックだけ frozenset で行う
+INDUSTRY_OPTIONS_SET = frozenset(INDUSTRY_OPTIONS)
 
 # 福祉事業所：追加の分岐（v0.6.4）
 WELFARE_DOMAIN_PRESETS = [
@@ -10699,6 +11343,7 @@ COLOR_PRESETS = [
     {"value": "yellow", "label": "黄", "impression": "明るさ"},
 ]
 COLOR_OPTIONS = [x["value"] for x in COLOR_PRESETS]
+COLOR_OPTIONS_SET = frozenset(COLOR_OPTIONS)
 
 BG_STRENGTH_PRESETS = [
     {"value": "weak", "label": "弱", "hint": "背景をやさしく、静かに見せる"},
@@ -10801,7 +11446,7 @@ def build_completed_hp_design_profile(step1: Optional[dict]) -> dict:
     src = step1 if isinstance(step1, dict) else {}
     primary = str(src.get("primary_color") or "blue").strip() or "blue"
     primary = COLOR_MIGRATION.get(primary, primary)
-    if primary not in COLOR_OPTIONS:
+    if primary not in COLOR_OPTIONS_SET:
         primary = "blue"
     bg_strength = _normalize_bg_strength(src.get("bg_strength") or "medium")
     bg_motion = _normalize_bg_motion(src.get("bg_motion") or "medium")
@@ -10861,14 +11506,8 @@ def build_builder_preview_delta_payload(project_obj: Optional[dict], mode: str =
     step1 = data.get("step1") if isinstance(data.get("step1"), dict) else {}
     mode = "pc" if str(mode or "mobile").strip() == "pc" else "mobile"
     design_w = 860 if mode == "mobile" else 1080
-    radius = 22 if mode == "mobile" else 14
-    frame_style = (
-        f"{'width: min(100%, 1080px);' if mode == 'pc' else 'width: 100%;'} min-height: 0; height: auto; overflow: hidden; border-radius: {radius}px; margin: 0 auto;"
-    )
-    fit_style = (
-        "width: 100%; min-height: 0; height: auto; display: block; overflow-x: hidden; overflow-y: hidden; position: relative; "
-        + _preview_stage_shell_style(step1)
-    )
+    # 枠の形（幅・角丸）はモード別クラスで決まるので、送るのはテーマ変数だけ
+    fit_style = _preview_stage_shell_style(step1)
     profile = build_completed_hp_design_profile(step1)
     primary_key = str(step1.get("primary_color") or "blue").strip()
     return {
@@ -10876,7 +11515,6 @@ def build_builder_preview_delta_payload(project_obj: Optional[dict], mode: str =
         "design_w": design_w,
         "min_scale": 0.01,
         "max_scale": 1.0,
-        "frame_style": frame_style,
         "fit_style": fit_style,
         "root_style": _preview_glass_style(step1, dark=(primary_key in {"black", "navy"})),
         "is_dark": bool(primary_key in {"black", "navy"}),
@@ -11429,6 +12067,16 @@ COLOR_HEX = {
     "yellow": "#f9a825",
 }
 
+# Step1 の色カード用: スウォッチの style と印象の文言を起動時に作っておく
+COLOR_CHOICE_ITEMS = tuple(
+    dict(
+        opt,
+        swatch_style=f"background:{COLOR_HEX.get(opt['value'], '#999')};",
+        impression_text=f"印象：{opt['impression']}",
+    )
+    for opt in COLOR_PRESETS
+)
+
 # 旧データの色名が来ても崩れないように吸収
 COLOR_MIGRATION = {
     "indigo": "blue",
@@ -11496,9 +12144,8 @@ def project_images_meta_path(project_id: str) -> str:
 
 
 def new_project_id() -> str:
-    ts = datetime.now(JST).strftime("%Y%m%d%H%M%S")
-    rnd = secrets.token_hex(3)
-    return f"p{ts}_{rnd}"
+    n = datetime.now(JST)
+    return f"p{n.year:04d}{n.month:02d}{n.day:02d}{n.hour:02d}{n.minute:02d}{n.second:02d}_{secrets.token_hex(3)}"
 
 
 def apply_template_starter_defaults(p: dict, template_id: str) -> None:
@@ -11938,13 +12585,88 @@ def apply_template_starter_defaults(p: dict, template_id: str) -> None:
         return
 
 
+# normalize_project で「無ければ補う」だけの項目（値はすべて不変な str/bool/int なのでコピー不要）
+_PROJECT_STEP2_DEFAULTS = {
+    "company_name": "",
+    "favicon_url": "",
+    "favicon_filename": "",
+    "logo_url": "",
+    "logo_filename": "",
+    "catch_copy": "",
+    "catch_size": "中",
+    "sub_catch_size": "中",
+    "phone": "",
+    "address": "",
+    "email": "",
+}
+_PROJECT_ACCESS_DEFAULTS = {
+    "map_url": "",
+    "embed_map": True,  # v0.6.995: GoogleMap iframe（任意 / 重い場合あり）
+    "notes": "（例）〇〇駅から徒歩5分 / 駐車場あり",
+}
+_PROJECT_CONTACT_DEFAULTS = {
+    "hours": "平日 9:00〜18:00",
+    "message": "まずはお気軽にご相談ください。",
+    # v0.8: お問い合わせフォーム方式（フォーム/PHP・外部フォームURL・メール対応）
+    "form_mode": "フォーム方式（おすすめ）",
+    "external_form_url": "",
+}
+_PROJECT_APPROVAL_DEFAULTS = {
+    "status": "draft",  # draft / requested / approved / rejected
+    "requested_at": "",
+    "requested_by": "",
+    "request_note": "",
+    "reviewed_at": "",
+    "reviewed_by": "",
+    "review_note": "",
+    "approved_at": "",
+    "approved_by": "",
+    "approved_note": "",
+}
+_PROJECT_WORKFLOW_DEFAULTS = {
+    "last_export_at": "",
+    "last_export_by": "",
+    "last_backup_zip_at": "",
+    "last_backup_zip_by": "",
+    "last_backup_zip_file": "",
+    "last_publish_at": "",
+    "last_publish_by": "",
+    "last_publish_target": "",
+}
+_PROJECT_PUBLISH_DEFAULTS = {
+    "sftp_host": "",
+    "sftp_user": "",
+    "sftp_dir": "",
+    "sftp_note": "",  # メモ（例: サーバー会社/案件番号など）
+    "cleanup_exclude": "",
+    "public_site_url": "",
+    "google_service_account_file": "",
+}
+
+
+def _fill_missing_defaults(target: dict, defaults: dict) -> None:
+    """target に無いキーだけ defaults の値で補う（setdefault の連続呼び出しをまとめたもの）。
+
+    UI が同じ dict を参照しているため、新しい dict は作らずにその場で更新する。
+    """
+    # 保存済み project.json ではほぼ全キーが揃っているので、まず集合演算1回で抜けが無いか確かめる
+    if defaults.keys() <= target.keys():
+        return
+    # キー順を defaults の並びに揃えるため、集合ではなく defaults 側を順に見る
+    for k, v in defaults.items():
+        if k not in target:
+            target[k] = v
+
+
 def _normalize_project__base_7211(p: dict) -> dict:
     """project.json をアプリ内で扱いやすい形に整える（足りない項目を補う）。"""
     if not isinstance(p, dict):
         p = {}
 
     p["schema_version"] = "0.8.0"
-    p.setdefault("project_id", new_project_id())
+    # setdefault だと既存IDがあっても毎回IDを作ってしまうので、無いときだけ作る
+    if "project_id" not in p:
+        p["project_id"] = new_project_id()
     p.setdefault("project_name", "(no name)")
 
     # 旧データがUTCでも、ここでJSTへ寄せる（表示も保存もブレないように）
@@ -11981,13 +12703,14 @@ def _normalize_project__base_7211(p: dict) -> dict:
 
     # step1
     industry = step1.get("industry", "会社サイト（企業）")
-    if industry not in INDUSTRY_OPTIONS:
+    # 壊れた JSON で list などが入っていても frozenset 判定で落ちないように str だけ通す
+    if not isinstance(industry, str) or industry not in INDUSTRY_OPTIONS_SET:
         industry = "会社サイト（企業）"
     step1["industry"] = industry
 
     color = step1.get("primary_color", "blue")
     color = COLOR_MIGRATION.get(color, color)
-    if color not in COLOR_OPTIONS:
+    if color not in COLOR_OPTIONS_SET:
         color = "blue"
     step1["primary_color"] = color
     step1["bg_strength"] = _normalize_bg_strength(step1.get("bg_strength") or "medium")
@@ -12018,17 +12741,7 @@ def _normalize_project__base_7211(p: dict) -> dict:
     step1["template_id"] = resolve_template_id(step1)
 
     # step2
-    step2.setdefault("company_name", "")
-    step2.setdefault("favicon_url", "")
-    step2.setdefault("favicon_filename", "")
-    step2.setdefault("logo_url", "")
-    step2.setdefault("logo_filename", "")
-    step2.setdefault("catch_copy", "")
-    step2.setdefault("catch_size", "中")
-    step2.setdefault("sub_catch_size", "中")
-    step2.setdefault("phone", "")
-    step2.setdefault("address", "")
-    step2.setdefault("email", "")
+    _fill_missing_defaults(step2, _PROJECT_STEP2_DEFAULTS)
 
     # blocks
     hero = blocks.setdefault("hero", {})
@@ -12175,7 +12888,7 @@ def _normalize_project__base_7211(p: dict) -> dict:
         "items",
         [
             {
-                "date": datetime.now(JST).strftime("%Y-%m-%d"),
+                "date": today_jst(),
                 "category": "お知らせ",
                 "title": "サンプル：ホームページを公開しました",
                 "body": "ここにお知らせ本文を書きます。\n（あとで自由に書き換えできます）",
@@ -12184,9 +12897,9 @@ def _normalize_project__base_7211(p: dict) -> dict:
     )
     if not isinstance(news_items, list):
         news_items = []
+    # UI が同じ list を参照しているので、dict 以外は list を作り直さずに取り除く
+    news_items[:] = [it for it in news_items if isinstance(it, dict)]
     for it in news_items:
-        if not isinstance(it, dict):
-            continue
         it.setdefault("date", "")
         it.setdefault("category", "お知らせ")
         it.setdefault("title", "")
@@ -12203,24 +12916,17 @@ def _normalize_project__base_7211(p: dict) -> dict:
     )
     if not isinstance(faq_items, list):
         faq_items = []
+    faq_items[:] = [it for it in faq_items if isinstance(it, dict)]
     for it in faq_items:
-        if not isinstance(it, dict):
-            continue
         it.setdefault("q", "")
         it.setdefault("a", "")
     faq["items"] = faq_items
 
     access = blocks.setdefault("access", {})
-    access.setdefault("map_url", "")
-    access.setdefault("embed_map", True)  # v0.6.995: GoogleMap iframe（任意 / 重い場合あり）
-    access.setdefault("notes", "（例）〇〇駅から徒歩5分 / 駐車場あり")
+    _fill_missing_defaults(access, _PROJECT_ACCESS_DEFAULTS)
 
     contact = blocks.setdefault("contact", {})
-    contact.setdefault("hours", "平日 9:00〜18:00")
-    contact.setdefault("message", "まずはお気軽にご相談ください。")
-    # v0.8: お問い合わせフォーム方式（フォーム/PHP・外部フォームURL・メール対応）
-    contact.setdefault("form_mode", "フォーム方式（おすすめ）")
-    contact.setdefault("external_form_url", "")
+    _fill_missing_defaults(contact, _PROJECT_CONTACT_DEFAULTS)
 
     recruitment = _normalize_recruitment_block(blocks.setdefault("recruitment", {}))
     blocks["recruitment"] = recruitment
@@ -12250,43 +12956,20 @@ def _normalize_project__base_7211(p: dict) -> dict:
         approval = {}
         workflow["approval"] = approval
 
-    approval.setdefault("status", "draft")  # draft / requested / approved / rejected
-    approval.setdefault("requested_at", "")
-    approval.setdefault("requested_by", "")
-    approval.setdefault("request_note", "")
-    approval.setdefault("reviewed_at", "")
-    approval.setdefault("reviewed_by", "")
-    approval.setdefault("review_note", "")
-    approval.setdefault("approved_at", "")
-    approval.setdefault("approved_by", "")
-    approval.setdefault("approved_note", "")
-
-    workflow.setdefault("last_export_at", "")
-    workflow.setdefault("last_export_by", "")
-    workflow.setdefault("last_backup_zip_at", "")
-    workflow.setdefault("last_backup_zip_by", "")
-    workflow.setdefault("last_backup_zip_file", "")
-    workflow.setdefault("last_publish_at", "")
-    workflow.setdefault("last_publish_by", "")
-    workflow.setdefault("last_publish_target", "")
+    _fill_missing_defaults(approval, _PROJECT_APPROVAL_DEFAULTS)
+    _fill_missing_defaults(workflow, _PROJECT_WORKFLOW_DEFAULTS)
 
     publish = data.get("publish")
     if not isinstance(publish, dict):
         publish = {}
         data["publish"] = publish
 
-    publish.setdefault("sftp_host", "")
+    _fill_missing_defaults(publish, _PROJECT_PUBLISH_DEFAULTS)
     # portは文字列で入っても壊れないようにintへ
     try:
         publish["sftp_port"] = int(publish.get("sftp_port", 22) or 22)
     except Exception:
         publish["sftp_port"] = 22
-    publish.setdefault("sftp_user", "")
-    publish.setdefault("sftp_dir", "")
-    publish.setdefault("sftp_note", "")  # メモ（例: サーバー会社/案件番号など）
-    publish.setdefault("cleanup_exclude", "")
-    publish.setdefault("public_site_url", "")
-    publish.setdefault("google_service_account_file", "")
     publish["google_indexing_enabled"] = _as_bool(publish.get("google_indexing_enabled"), default=True)
 
     return p
@@ -12312,6 +12995,7 @@ def _get_current_project__base_7563(user: Optional[User]) -> Optional[dict]:
 
     shared_cached = _project_load_cache_get(str(pid or ""))
     if isinstance(shared_cached, dict):
+        PROJECT_CACHE.mark_clean(user.id)  # 別案件のキャッシュを置き換えるので未保存印も外す
         PROJECT_CACHE[user.id] = shared_cached
         try:
             app.storage.user["current_project_name"] = shared_cached.get("project_name", "")
@@ -12323,6 +13007,7 @@ def _get_current_project__base_7563(user: Optional[User]) -> Optional[dict]:
     # キャッシュが無い場合だけロード
     try:
         p = load_project_from_sftp(pid, user)
+        PROJECT_CACHE.mark_clean(user.id)
         PROJECT_CACHE[user.id] = p
         app.storage.user["current_project_name"] = p.get("project_name", "")
         cleanup_user_storage()
@@ -12339,6 +13024,10 @@ def _set_current_project__base_7598(p: dict, user: Optional[User]) -> None:
     """現在の案件を「選択状態」にする（ID/名前だけをstorageに、実体はキャッシュへ）。"""
     p = normalize_project(p)
     if user:
+        prev = PROJECT_CACHE.get(user.id)
+        if not (isinstance(prev, dict) and prev.get("project_id") == p.get("project_id")):
+            # 別の案件に切り替えたら、前の案件の未保存印は外す（残すと期限切れでも件数超過でも捨てられなくなる）
+            PROJECT_CACHE.mark_clean(user.id)
         PROJECT_CACHE[user.id] = p
         app.storage.user["current_project_id"] = p.get("project_id")
         app.storage.user["current_project_name"] = p.get("project_name", "")
@@ -12568,10 +13257,11 @@ _build_project_meta = __build_project_meta__base_7807
 
 
 
-def _build_project_images_meta(p: dict) -> dict:
+def _build_project_images_meta(p: dict, raw_items: Optional[list[dict]] = None) -> dict:
     """画像一覧ダイアログ専用の軽量メタ。"""
     p = normalize_project(p)
-    raw_items = collect_project_images(p)
+    if raw_items is None:
+        raw_items = collect_project_images(p)
     items: list[dict] = []
     total_kb = 0
 
@@ -12606,6 +13296,26 @@ def _build_project_images_meta(p: dict) -> dict:
     }
 
 
+# project_id -> (最後に書いた images_meta の画像の並び（label, filename, data_sha1）, 書いた直後のリモートの (mtime, size))。
+# 一覧ダイアログは items しか読まないので、画像が変わっていない保存ではサムネ作成とアップロードを飛ばす。
+# 記録はこのプロセスのメモリだけなので、飛ばす前にリモートの images_meta を stat し、
+# 別プロセス・別インスタンスの保存やバックアップ復元で書き換わっていれば（stamp が違えば）作り直す。
+_PROJECT_IMAGES_META_SIG: dict[str, tuple[tuple, tuple[int, int]]] = {}
+
+
+def _project_images_signature(raw_items: list[dict]) -> tuple:
+    return tuple((x.get("label"), x.get("filename"), x.get("data_sha1")) for x in raw_items)
+
+
+def _sftp_file_stamp(sftp: paramiko.SFTPClient, remote_path: str) -> Optional[tuple[int, int]]:
+    try:
+        with _sftp_io_guard(sftp):
+            st = sftp.stat(remote_path)
+    except Exception:
+        return None
+    return (int(st.st_mtime or 0), int(st.st_size or 0))
+
+
 def _save_project_to_sftp__base_7860(p: dict, user: Optional[User]) -> None:
     p = normalize_project(p)
     p["updated_at"] = now_jst_iso()
@@ -12618,13 +13328,22 @@ def _save_project_to_sftp__base_7860(p: dict, user: Optional[User]) -> None:
         return
 
     storage_payload = _project_storage_payload(p)
-    body_text = json.dumps(storage_payload, ensure_ascii=False, separators=(",", ":"))
+    body_text = _json_dumps_compact(storage_payload)
     body_bytes = body_text.encode("utf-8")
     gz_bytes = gzip.compress(body_bytes, compresslevel=6)
     meta = _build_project_meta(storage_payload, json_bytes=len(body_bytes), gz_bytes=len(gz_bytes))
+    pid = str(p.get("project_id") or "")
+    images_sig = None
+    images_meta = None
+    raw_images: list[dict] = []
     try:
-        images_meta = _build_project_images_meta(storage_payload)
+        raw_images = collect_project_images(storage_payload)
+        images_sig = _project_images_signature(raw_images)
+        known = _PROJECT_IMAGES_META_SIG.get(pid)
+        if known is None or known[0] != images_sig:
+            images_meta = _build_project_images_meta(storage_payload, raw_images)
     except Exception:
+        images_sig = None
         images_meta = {
             "project_id": str(storage_payload.get("project_id") or ""),
             "project_name": str(storage_payload.get("project_name") or ""),
@@ -12643,13 +13362,28 @@ def _save_project_to_sftp__base_7860(p: dict, user: Optional[User]) -> None:
         sftp_write_bytes(sftp, remote, body_bytes)
         sftp_write_bytes(sftp, remote_gz, gz_bytes)
         sftp_write_text(sftp, remote_meta, json.dumps(meta, ensure_ascii=False, separators=(",", ":")))
-        try:
-            sftp_write_text(sftp, remote_images_meta, json.dumps(images_meta, ensure_ascii=False, separators=(",", ":")))
-        except Exception:
-            pass
+        if images_meta is None:
+            # 画像は前回書いたときと同じ。リモートも前回書いたままなら書き直さない
+            known = _PROJECT_IMAGES_META_SIG.get(pid)
+            if known is None or _sftp_file_stamp(sftp, remote_images_meta) != known[1]:
+                try:
+                    images_meta = _build_project_images_meta(storage_payload, raw_images)
+                except Exception:
+                    images_meta = None
+                    _PROJECT_IMAGES_META_SIG.pop(pid, None)
+        if images_meta is not None:
+            try:
+                sftp_write_text(sftp, remote_images_meta, json.dumps(images_meta, ensure_ascii=False, separators=(",", ":")))
+                stamp = _sftp_file_stamp(sftp, remote_images_meta) if images_sig is not None else None
+                if stamp is None:
+                    _PROJECT_IMAGES_META_SIG.pop(pid, None)
+                else:
+                    _PROJECT_IMAGES_META_SIG[pid] = (images_sig, stamp)
+            except Exception:
+                _PROJECT_IMAGES_META_SIG.pop(pid, None)
 
     _project_load_cache_put(str(p.get("project_id") or ""), storage_payload)
-    _project_list_cache_invalidate()
+    _project_list_cache_invalidate(str(p.get("project_id") or ""))
 
     if user:
         safe_log_action(user, "project_save", details=json.dumps({"project_id": p["project_id"], "json_bytes": len(body_bytes), "json_gz_bytes": len(gz_bytes)}, ensure_ascii=False))
@@ -12731,7 +13465,7 @@ def _load_project_from_sftp__base_7931(project_id: str, user: Optional[User]) ->
     if not body:
         raise RuntimeError(f"案件の読み込みに失敗しました: {sanitize_error_text(last_error or 'empty project body')}")
 
-    p = normalize_project(json.loads(body))
+    p = normalize_project(_json_loads(body))
     _project_load_cache_put(pid, p)
     if user:
         safe_log_action(user, "project_load", details=json.dumps({"project_id": pid}, ensure_ascii=False))
@@ -12759,11 +13493,11 @@ def _list_projects_from_sftp__base_7986() -> list[dict]:
             projects.append({
                 "project_id": _p.get("project_id", ""),
                 "project_name": _p.get("project_name", ""),
-                "updated_at": _p.get("updated_at", ""),
+                "updated_at": str(_p.get("updated_at") or ""),
                 "created_at": _p.get("created_at", ""),
                 "updated_by": _p.get("updated_by", ""),
             })
-        projects.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+        projects.sort(key=itemgetter("updated_at"), reverse=True)
         return projects
 
     cached_items = _project_list_cache_get()
@@ -12833,7 +13567,7 @@ def _list_projects_from_sftp__base_7986() -> list[dict]:
             except Exception:
                 projects.append({"project_id": d, "project_name": "(broken project.json)", "updated_at": "", "created_at": "", "updated_by": ""})
 
-    projects.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+    projects.sort(key=itemgetter("updated_at"), reverse=True)
     _project_list_cache_put(projects)
     return projects
 # canonical alias retained for staged override compatibility
@@ -14224,6 +14958,11 @@ def build_contact_section_html(
 
     return card_html
 
+# 求人ページの要約1行用：改行・区切り記号（・ / ｜ |）で区切った1かたまり。
+# \r も区切りに含めるので、CRLF の置換で全文をなめ直さずに済む
+_SUMMARY_SEGMENT_RE = re.compile(r"[^\r\n・/｜|]+")
+
+
 def build_static_site_files(p: dict) -> dict[str, bytes]:
     """案件データから、公開用の静的ファイル一式を生成して返す。
 
@@ -18530,7 +19269,7 @@ body{ top:0 !important; }
 
     # map_url が空でも、住所があれば GoogleMap リンクを自動生成（プレビューと同じ挙動）
     if (not map_url) and address:
-        map_url = f"https://www.google.com/maps/search/?api=1&query={quote_plus(address)}"
+        map_url = google_maps_url(address)
 
     # v0.6.995: GoogleMap iframe（任意 / 重い場合あり）
     # 旧データ互換: embed / embed_map の両方を見る（デフォルトは True）
@@ -18542,7 +19281,7 @@ body{ top:0 !important; }
     # iframe src は map_url ではなく address から作る（search API は iframe だと表示されない場合がある）
     iframe_src = ""
     if address:
-        iframe_src = f"https://www.google.com/maps?q={quote_plus(address)}&output=embed"
+        iframe_src = google_maps_embed_url(address)
     elif map_url:
         iframe_src = map_url
 
@@ -18663,11 +19402,11 @@ body{ top:0 !important; }
 """
 
     def _summary_line(text: str, fallback: str = "内容を調整中です。", limit: int = 46) -> str:
-        raw = str(text or "").replace("\r\n", "\n").replace("\r", "\n").strip()
+        raw = str(text or "").strip()
         if not raw:
             return fallback
-        parts = [seg.strip() for seg in re.split(r"\n+|[・/｜|]+", raw) if seg.strip()]
-        line = parts[0] if parts else raw
+        # 使うのは最初の1かたまりだけなので、全文を split せず先頭から探して見つかった時点で止める
+        line = next((seg for seg in (m.group().strip() for m in _SUMMARY_SEGMENT_RE.finditer(raw)) if seg), raw)
         line = re.sub(r"\s+", " ", line).strip()
         if len(line) > limit:
             line = line[:limit].rstrip() + "…"
@@ -21243,6 +21982,133 @@ publish_site_via_sftp = _publish_site_via_sftp__base_14517
 
 
 
+# =========================
+# [BLK-09] UI components: standard input (fast path)
+# =========================
+
+# ビルダーの入力欄は props/classes が毎回同じなので、文字列パースを通さず直接入れる。
+_STD_INPUT_PROPS = {"outlined": True}
+_STD_INPUT_TEXTAREA_PROPS = {"outlined": True, "type": "textarea", "autogrow": True}
+_STD_INPUT_CLASSES = ("w-full", "q-mb-sm")
+_STD_INPUT_CLASSES_MT = ("w-full", "q-mt-sm")
+
+
+def std_input(
+    label: str,
+    value: str = "",
+    on_change=None,
+    *,
+    textarea: bool = False,
+    dense: bool = False,
+    input_type: str = "",
+    hint: str = "",
+    classes: tuple[str, ...] = _STD_INPUT_CLASSES,
+):
+    """outlined + w-full q-mb-sm の標準入力欄を作る（.props()/.classes() の文字列パースを省略）。"""
+    el = ui.input(label, value=value, on_change=on_change)
+    el._props.update(_STD_INPUT_TEXTAREA_PROPS if textarea else _STD_INPUT_PROPS)
+    if input_type:
+        el._props["type"] = input_type
+    if dense:
+        el._props["dense"] = True
+    if hint:
+        el._props["hint"] = hint
+    el._classes.extend(classes)
+    return el
+
+
+def _set_dict_from_input(target: dict, key: str, on_changed: Callable[[], None], e) -> None:
+    """ui.input の値を target[key] に入れて on_changed() を呼ぶ（同値なら何もしない）。partial で束ねて使う。"""
+    value = e.value or ""
+    if (target.get(key) or "") == value:
+        return
+    target[key] = value
+    on_changed()
+
+
+def _forward_input_value(fn: Callable[[Any, Any, str], None], first, second, e) -> None:
+    """ui.input の値で fn(first, second, value) を呼ぶ。partial で束ねて使う。"""
+    fn(first, second, e.value or "")
+
+
+# 選択肢がこれより多い一覧はカードを並べず ui.select 1つにする（カードは1件あたり5〜6要素になるため）
+CHOICE_CARDS_MAX = max(1, _env_int("CVHB_CHOICE_CARDS_MAX", 12))
+
+
+def _build_choice_select(options, current: str, on_pick: Callable[[str], None]) -> Callable[[str], None]:
+    """build_choice_cards の件数が多いときの簡易版（ui.select 1つ）。"""
+    state = {"value": current}
+
+    def _on_change(e) -> None:
+        value = e.value
+        if value is None or value == state["value"]:
+            return
+        on_pick(value)
+
+    sel = ui.select({opt["value"]: opt["label"] for opt in options}, value=current, on_change=_on_change)
+    sel._props.update(_STD_INPUT_PROPS)
+    sel._classes.extend(_STD_INPUT_CLASSES)
+
+    def select(value: str) -> None:
+        if state["value"] == value:
+            return
+        state["value"] = value
+        sel.set_value(value)
+
+    return select
+
+
+def build_choice_cards(
+    options,
+    current: str,
+    on_pick: Callable[[str], None],
+    render_body: Callable[[dict], Any],
+    *,
+    card_classes: str = "q-pa-sm q-mb-xs cvhb-choice",
+    card_style: str = "width: 100%;",
+) -> Callable[[str], None]:
+    """cvhb-choice の選択カードを並べ、選択表示を切り替える関数を返す。
+
+    render_body(opt) はカードの中身を描き、チェックアイコンを置く要素を返す。
+    切替は前後2枚の is-selected とチェックの表示だけを書き換える（一覧は作り直さない）。
+    選択肢が CHOICE_CARDS_MAX を超えるときは ui.select で代用する（render_body は使わない）。
+    """
+    if len(options) > CHOICE_CARDS_MAX:
+        return _build_choice_select(options, current, on_pick)
+    cards: dict[str, Any] = {}
+    checks: dict[str, Any] = {}
+    state = {"value": current}
+    selected_classes = f"{card_classes} is-selected"
+    for opt in options:
+        value = opt["value"]
+        selected = value == current
+        card = ui.card().classes(selected_classes if selected else card_classes).props("flat bordered")
+        if card_style:
+            card.style(card_style)
+        with card:
+            check_slot = render_body(opt)
+        with check_slot:
+            check = ui.icon("check_circle").classes("text-primary")
+        check.set_visibility(selected)
+        card.on("click", partial(on_pick, value))
+        cards[value] = card
+        checks[value] = check
+
+    def select(value: str) -> None:
+        prev = state["value"]
+        if prev == value:
+            return
+        state["value"] = value
+        if prev in cards:
+            cards[prev].classes(remove="is-selected")
+            checks[prev].set_visibility(False)
+        if value in cards:
+            cards[value].classes(add="is-selected")
+            checks[value].set_visibility(True)
+
+    return select
+
+
 # =========================
 # [BLK-09b] In-app Help Popup (v0.9.3)
 # =========================
@@ -21628,7 +22494,7 @@ def render_login(root_refresh) -> None:
             username = ui.input("ユーザー名").props("outlined").classes("w-full")
             password = ui.input("パスワード", password=True, password_toggle_button=True).props("outlined").classes("w-full")
 
-            def do_login() -> None:
+            async def do_login() -> None:
                 un = (username.value or "").strip()
                 pw = (password.value or "")
                 if not un or not pw:
@@ -21644,13 +22510,19 @@ def render_login(root_refresh) -> None:
 
                 row = get_user_by_username(un)
                 reason = login_block_reason(row)
-                if not row or reason or not verify_password(pw, row["password_hash"]):
+                # scrypt / PBKDF2 の計算中もイベントループを止めない
+                if not row or reason or not await asyncio.to_thread(verify_password, pw, row["password_hash"]):
                     _record_login_failure(login_key)
                     safe_log_action(None, "login_failed", details=json.dumps({"username": un}, ensure_ascii=False))
                     ui.notify(reason or "ユーザー名またはパスワードが違います", type="negative")
                     return
 
                 _clear_login_failures(login_key)
+                if password_needs_rehash(row["password_hash"]):
+                    try:
+                        await asyncio.to_thread(upgrade_password_hash, row["id"], pw, row["password_hash"])
+                    except Exception as e:
+                        print(f"[auth] password hash upgrade failed: {sanitize_error_text(e)}", flush=True)
                 set_logged_in(row)
                 cleanup_user_storage()
                 u = current_user()
@@ -21691,7 +22563,7 @@ def render_first_admin_setup(root_refresh) -> None:
             password = ui.input("パスワード", password=True, password_toggle_button=True).props("outlined").classes("w-full")
             password2 = ui.input("パスワード（確認）", password=True, password_toggle_button=True).props("outlined").classes("w-full")
 
-            def create_admin() -> None:
+            async def create_admin() -> None:
                 un = (username.value or "").strip()
                 pw = (password.value or "")
                 pw2 = (password2.value or "")
@@ -21705,7 +22577,7 @@ def render_first_admin_setup(root_refresh) -> None:
                     ui.notify("パスワードは10文字以上がおすすめです", type="warning")
                     return
 
-                create_user(un, pw, "admin")
+                await asyncio.to_thread(create_user, un, pw, "admin")
                 row = get_user_by_username(un)
                 if row:
                     set_logged_in(row)
@@ -21726,22 +22598,33 @@ def render_first_admin_setup(root_refresh) -> None:
 # =========================
 # [BLK-10] Preview: Glassmorphism theme (SP/PC)
 
+_LIGHT_COLORS = frozenset(("white", "yellow"))
+
+
 def _is_light_color(color_value: str) -> bool:
-    return str(color_value) in {"white", "yellow"}
+    return color_value in _LIGHT_COLORS
 
 def _safe_primary_text_class(primary: str) -> str:
     return "text-black" if _is_light_color(primary) else "text-white"
 
+# "00".."ff"（大文字も）-> 0..255。int(x, 16) の数値パースを通さず辞書引きだけで済ませる
+_HEX_BYTE: dict[str, int] = {f"{i:02x}": i for i in range(256)}
+_HEX_BYTE.update({k.upper(): v for k, v in list(_HEX_BYTE.items())})
+_HEX_BYTE.update({f"{k[0]}{k[1].upper()}": v for k, v in list(_HEX_BYTE.items())})
+_HEX_BYTE.update({f"{k[0].upper()}{k[1]}": v for k, v in list(_HEX_BYTE.items())})
+
+
+@lru_cache(maxsize=64)
 def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
     h = (hex_color or "").strip().lstrip("#")
     if len(h) == 3:
-        h = "".join([c * 2 for c in h])
-    if len(h) != 6:
-        return (25, 118, 210)  # fallback (Quasar primary blue)
-    r = int(h[0:2], 16)
-    g = int(h[2:4], 16)
-    b = int(h[4:6], 16)
-    return (r, g, b)
+        h = h[0] * 2 + h[1] * 2 + h[2] * 2
+    try:
+        if len(h) == 6:
+            return (_HEX_BYTE[h[0:2]], _HEX_BYTE[h[2:4]], _HEX_BYTE[h[4:6]])
+    except KeyError:
+        pass
+    return (25, 118, 210)  # fallback (Quasar primary blue)
 
 def _rgb_to_hex(r: int, g: int, b: int) -> str:
     r = max(0, min(255, int(r)))
@@ -21749,22 +22632,23 @@ def _rgb_to_hex(r: int, g: int, b: int) -> str:
     b = max(0, min(255, int(b)))
     return f"#{r:02x}{g:02x}{b:02x}"
 
+@lru_cache(maxsize=256)
 def _blend_hex(c1: str, c2: str, t: float) -> str:
     """c1 と c2 を t(0..1) でブレンド"""
     t = max(0.0, min(1.0, float(t)))
     r1, g1, b1 = _hex_to_rgb(c1)
     r2, g2, b2 = _hex_to_rgb(c2)
-    r = r1 + (r2 - r1) * t
-    g = g1 + (g2 - g1) * t
-    b = b1 + (b2 - b1) * t
-    return _rgb_to_hex(r, g, b)
+    # 両端が 0..255 で t も 0..1 に収めているので、結果も 0..255（_rgb_to_hex のクランプは不要）。
+    # 切り捨て（int）は従来と同じなので、出力される色は変わらない
+    return f"#{int(r1 + (r2 - r1) * t):02x}{int(g1 + (g2 - g1) * t):02x}{int(b1 + (b2 - b1) * t):02x}"
 
+@lru_cache(maxsize=64)
 def _is_light_hex(hex_color: str) -> bool:
     r, g, b = _hex_to_rgb(hex_color)
-    # 相対輝度（ざっくり）
-    y = (r * 0.299) + (g * 0.587) + (b * 0.114)
-    return y >= 165
+    # 相対輝度（ざっくり）。係数を 1000 倍した整数で比較（境界値の浮動小数誤差も出ない）
+    return (r * 299 + g * 587 + b * 114) >= 165000
 
+@lru_cache(maxsize=64)
 def _preview_accent_hex(primary: str) -> str:
     """プレビュー用のアクセント色（ガラステーマ用）"""
     # 「白」はアクセントが白だと見えないので、濃い色に寄せる（=白基調 + 濃いアクセント）
@@ -21843,17 +22727,28 @@ def _preview_glass_style(step1_or_primary=None, *, dark: Optional[bool] = None,
         ui_motion = "medium"
 
     primary = COLOR_MIGRATION.get(primary, primary)
-    if primary not in COLOR_OPTIONS:
+    if primary not in COLOR_OPTIONS_SET:
         primary = "blue"
 
+    if dark is None:
+        dark = (primary == "black")
+    return _preview_glass_style_vars(primary, strength, motion_strength, ui_strength, ui_motion, bool(dark))
+
+
+@lru_cache(maxsize=256)
+def _preview_glass_style_vars(
+    primary: str,
+    strength: str,
+    motion_strength: str,
+    ui_strength: str,
+    ui_motion: str,
+    is_dark: bool,
+) -> str:
+    """_preview_glass_style の本体。入力は正規化済みのキーだけなので、組み合わせごとに結果を使い回す。"""
     accent = _preview_accent_hex(primary)
     accent2 = _preview_accent2_hex(primary, accent)
     accent3 = _blend_hex(accent, accent2, 0.5)
 
-    if dark is None:
-        dark = (primary == "black")
-    is_dark = bool(dark)
-
     def _rgba(hex_color: str, alpha: float) -> str:
         r, g, b = _hex_to_rgb(hex_color)
         a = max(0.0, min(1.0, float(alpha)))
@@ -22201,18 +23096,41 @@ def _preview_glass_style(step1_or_primary=None, *, dark: Optional[bool] = None,
 
 
 def _preview_stage_shell_style(step1_or_primary=None) -> str:
-    """builder外枠にもページ本体と同じ背景を敷く（右上の白抜け対策）。"""
-    theme = _preview_glass_style(step1_or_primary)
-    return (
-        f"{theme};"
-        "background-image: var(--pv-bg-img);"
-        "background-color: var(--pv-base-1);"
-        "background-size: var(--pv-base-size);"
-        "background-position: var(--pv-base-pos-from, center top);"
-        "background-repeat: no-repeat;"
-        "overflow: hidden;"
-        "contain: paint;"
-    )
+    """builder外枠にもページ本体と同じ背景を敷く（右上の白抜け対策）。
+
+    背景の敷き方は .cvhb-preview-stage-themed（グローバルCSS）側にあり、ここでは案件ごとの変数だけ返す。
+    """
+    return f"{_preview_glass_style(step1_or_primary)};"
+
+
+# 既定設定（背景/UIの強さ・動きとも medium）の全カラーは起動時に lru_cache へ入れておき、
+# 新規案件や設定を変えていない案件では初回プレビューでも色計算をしない（全9色で1ms程度）。
+for _color_key in COLOR_OPTIONS:
+    _preview_glass_style(_color_key)
+del _color_key
+
+
+@lru_cache(maxsize=256)
+def _preview_theme_class_name(theme_style: str) -> str:
+    return f"cvhb-glass-{hashlib.blake2b(theme_style.encode('utf-8'), digest_size=6).hexdigest()}"
+
+
+def _preview_theme_class(theme_style: str) -> str:
+    """テーマ変数（80行ほど）を毎回 inline style で送らず、クラス1つにまとめる。
+
+    <style> はクライアントごとに同じ組み合わせ1回だけ head へ入れる（描画後は NiceGUI が JS で挿す）。
+    """
+    cls = _preview_theme_class_name(theme_style)
+    try:
+        injected = app.storage.client.setdefault("cvhb_preview_theme_classes", set())
+    except Exception:
+        injected = None
+    if injected is not None and cls in injected:
+        return cls
+    ui.add_head_html(f"<style>.pv-shell.{cls}{{{theme_style}}}</style>")
+    if injected is not None:
+        injected.add(cls)
+    return cls
 
 
 DEPTH_BG_CSS = r"""
@@ -23498,10 +24416,71 @@ body.pv-page-body > #pv-root.pv-shell .pv-main > .pv-section:first-child{
 """
 
 
-def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None, in_builder: bool = False) -> None:
+def preview_content_key(p: dict, *extra: object) -> str:
+    """プレビュー描画の入力（案件dict＋表示条件）のダイジェスト。
+
+    同じキーなら描画結果も同じなので、再描画を省略してよい。作れないときは "" を返す。
+    描画が読むのは p["data"] だけなので、保存のたびに変わる updated_at などはキーに入れない。
+    """
+    data = p.get("data") if isinstance(p, dict) and isinstance(p.get("data"), dict) else p
+    if orjson is not None:
+        try:
+            payload = orjson.dumps([data, extra], default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+            return hashlib.blake2b(payload, digest_size=16).hexdigest()
+        except Exception:
+            pass
+    try:
+        payload = json.dumps([data, extra], ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    except Exception:
+        return ""
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class PreviewModeSpec:
+    """プレビューのモード（mobile / pc）ごとに変わる値。描画中に mode で分岐せず、ここから引く。"""
+    image_dims: tuple[int, int]  # builder 外での画像の縮小サイズ（hero / about / services / recruitment）
+    news_limit: int
+    slider_axis: str
+    desktop_nav: bool
+
+
+PREVIEW_MODE_SPECS: dict[str, PreviewModeSpec] = {
+    "mobile": PreviewModeSpec(image_dims=(860, 484), news_limit=3, slider_axis="y", desktop_nav=False),
+    "pc": PreviewModeSpec(image_dims=(1080, 608), news_limit=4, slider_axis="x", desktop_nav=True),
+}
+
+# プレビュー内ナビのキー -> セクションID（描画のたびに作り直さない）
+PREVIEW_SECTION_IDS: dict[str, str] = {
+    "top": "pv-top",
+    "news": "pv-news",
+    "about": "pv-about",
+    "company_profile": "pv-about",
+    "services": "pv-about",
+    "faq": "pv-faq",
+    "access": "pv-access-contact",
+    "contact": "pv-access-contact",
+    "access_contact": "pv-access-contact",
+}
+
+# 画像未設定時の既定画像（プレビューと編集画面のサムネで共用）
+PREVIEW_ABOUT_IMAGE_DEFAULT = "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?auto=format&fit=crop&w=1280&h=720&q=60"  # wood/forest vibe
+PREVIEW_SERVICES_IMAGE_DEFAULT = "https://images.unsplash.com/photo-1524758631624-e2822e304c36?auto=format&fit=crop&w=1280&h=720&q=60"
+
+
+def render_preview(
+    p: dict,
+    mode: str = "pc",
+    *,
+    root_id: Optional[str] = None,
+    in_builder: bool = False,
+    section_refs: Optional[dict] = None,
+) -> None:
     """右側プレビュー（260218配置レイアウト）を描画する。
 
     p は「プロジェクト全体(dict)」または p["data"] 相当(dict) のどちらでも受け付ける。
+    section_refs を渡すと、ブロック単位で描き直せる部分の refresh を {block_key: fn} で入れて返す
+    （お知らせ / FAQ の一覧。そのブロックの編集だけならページ全体を作り直さずに済む）。
     """
     # -------- data extraction (project dict / data dict 両対応) --------
     if isinstance(p, dict) and isinstance(p.get("data"), dict):
@@ -23514,9 +24493,9 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
     # NOTE: ここで deep-copy + normalize を回すと（特に data URL を含む案件で）重くなるため、
     #       プレビュー側では参照時に不足キーを補完して表示する。
 
-    step1 = d.get("step1", {}) if isinstance(d.get("step1"), dict) else {}
-    step2 = d.get("step2", {}) if isinstance(d.get("step2"), dict) else {}
-    blocks = d.get("blocks", {}) if isinstance(d.get("blocks"), dict) else {}
+    step1 = _safe_dict(d.get("step1"))
+    step2 = _safe_dict(d.get("step2"))
+    blocks = _safe_dict(d.get("blocks"))
 
     # -------- theme --------
     primary_key = str(step1.get("primary_color") or "blue")
@@ -23524,8 +24503,9 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
 
     # mode / root id（プレビュー統合のため、root_id を外から差し替え可能にする）
     mode = str(mode or "mobile").strip() or "mobile"
-    if mode not in ("mobile", "pc"):
+    if mode not in PREVIEW_MODE_SPECS:
         mode = "mobile"
+    mode_spec = PREVIEW_MODE_SPECS[mode]
     root_id = str(root_id or f"pv-root-{mode}").strip() or f"pv-root-{mode}"
 
     theme_style = _preview_glass_style(step1, dark=is_dark)
@@ -23547,20 +24527,8 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
         return (220, 124) if preview_light_images else (480, 270)
 
     # -------- helpers --------
-    SECTION_IDS = {
-        "top": "pv-top",
-        "news": "pv-news",
-        "about": "pv-about",
-        "company_profile": "pv-about",
-        "services": "pv-about",
-        "faq": "pv-faq",
-        "access": "pv-access-contact",
-        "contact": "pv-access-contact",
-        "access_contact": "pv-access-contact",
-    }
-
     def scroll_to(section_id: str) -> None:
-        sid = SECTION_IDS.get(section_id, section_id)
+        sid = PREVIEW_SECTION_IDS.get(section_id, section_id)
         ui.run_javascript(f"window.cvhbPreviewScrollTo && window.cvhbPreviewScrollTo('{root_id}','{sid}')")
 
     def _clean(s: str, fallback: str = "") -> str:
@@ -23603,47 +24571,36 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
             '</nav>'
         )
 
-    hero = blocks.get("hero", {}) if isinstance(blocks.get("hero"), dict) else {}
+    hero = _safe_dict(blocks.get("hero"))
     hero_image_choice = _clean(hero.get("hero_image"), "A: オフィス")
     sub_catch = _clean(hero.get("sub_catch"))
 
     # hero slider images (max 4)
-    hero_urls = _safe_list(hero.get("hero_image_urls"))
+    # URL の _clean は1件1回だけ。プリセット引きは画像が1枚も無いときだけ
+    hero_urls = [u for u in map(_clean, _safe_list(hero.get("hero_image_urls"))) if u]
     _legacy_hero_url = _clean(hero.get("hero_image_url"))
     if _legacy_hero_url:
-        hero_urls = [_legacy_hero_url] + [u for u in hero_urls if _clean(u) and _clean(u) != _legacy_hero_url]
-    hero_urls = [_clean(u) for u in hero_urls if _clean(u)]
+        hero_urls = [_legacy_hero_url] + [u for u in hero_urls if u != _legacy_hero_url]
     if not hero_urls:
         hero_urls = [_clean(HERO_IMAGE_PRESETS.get(hero_image_choice), HERO_IMAGE_DEFAULT)]
     hero_urls = hero_urls[:4]
 
     # Ensure exactly 4 slides so dots are always 4 (fallback with presets if needed)
+    # ※ 旧実装の "A".."D" はプリセットのキー（"A: オフィス" 等）に一致せず、常に HERO_IMAGE_DEFAULT で埋まっていた
     if len(hero_urls) < 4:
-        pad_order = ["A", "B", "C", "D"]
-        for k in pad_order:
-            if len(hero_urls) >= 4:
-                break
-            hero_urls.append(_clean(HERO_IMAGE_PRESETS.get(k), HERO_IMAGE_DEFAULT))
-        hero_urls = hero_urls[:4]
+        hero_urls.extend([HERO_IMAGE_DEFAULT] * (4 - len(hero_urls)))
 
     # 1.5.1: builder軽量表示では1枚目だけを使い、初回表示と切替を軽くする
     hero_preview_urls = hero_urls[:1] if (in_builder and preview_light_images) else hero_urls
 
-    news = blocks.get("news", {}) if isinstance(blocks.get("news"), dict) else {}
-    news_items = _safe_list(news.get("items"))  # list[dict]
-
-    philosophy = blocks.get("philosophy", {}) if isinstance(blocks.get("philosophy"), dict) else {}
+    philosophy = _safe_dict(blocks.get("philosophy"))
     about_title = _clean(philosophy.get("title"), "私たちの想い")
     about_body = _clean(philosophy.get("body"))
     about_points = _safe_list(philosophy.get("points"))
 
-    about_image_url = _clean(
-        philosophy.get("image_url"),
-        # default: wood/forest vibe
-        "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?auto=format&fit=crop&w=1280&h=720&q=60",
-    )
+    about_image_url = _clean(philosophy.get("image_url"), PREVIEW_ABOUT_IMAGE_DEFAULT)
 
-    company_profile = philosophy.get("company_profile") if isinstance(philosophy.get("company_profile"), dict) else {}
+    company_profile = _safe_dict(philosophy.get("company_profile"))
     company_profile_mode = str(company_profile.get("mode") or "unused").strip() or "unused"
     if company_profile_mode not in COMPANY_PROFILE_MODE_OPTIONS:
         company_profile_mode = "unused"
@@ -23672,23 +24629,19 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
 
     profile_nav_label = company_profile_title if company_profile_mode != "unused" and company_profile_rows else ""
 
-    services = philosophy.get("services") if isinstance(philosophy.get("services"), dict) else {}
+    services = _safe_dict(philosophy.get("services"))
     svc_title = _clean(services.get("title"), "業務内容")
     svc_lead = _clean(services.get("lead"))
-    svc_image_url = _clean(
-        services.get("image_url"),
-        "https://images.unsplash.com/photo-1524758631624-e2822e304c36?auto=format&fit=crop&w=1280&h=720&q=60",
-    )
+    svc_image_url = _clean(services.get("image_url"), PREVIEW_SERVICES_IMAGE_DEFAULT)
     svc_items = _safe_list(services.get("items"))
 
-    faq = blocks.get("faq", {}) if isinstance(blocks.get("faq"), dict) else {}
-    faq_items = _safe_list(faq.get("items"))
-
-    access = blocks.get("access", {}) if isinstance(blocks.get("access"), dict) else {}
+    access = _safe_dict(blocks.get("access"))
     access_notes = _clean(access.get("notes"))
     map_url = _clean(access.get("map_url"))
     if not map_url and address:
-        map_url = f"https://www.google.com/maps/search/?api=1&query={quote_plus(address)}"
+        map_url = google_maps_url(address)
+    # props 文字列に埋め込む URL は json.dumps で1回だけクォートする（" や \ を含む URL でも props が壊れない）
+    map_href_prop = json.dumps(map_url, ensure_ascii=False)
 
     # v0.6.995: GoogleMap iframe（任意 / 重い場合あり）
     try:
@@ -23696,14 +24649,14 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
     except Exception:
         map_embed = True
 
-    contact = blocks.get("contact", {}) if isinstance(blocks.get("contact"), dict) else {}
+    contact = _safe_dict(blocks.get("contact"))
     contact_message = _clean(contact.get("message"))
     contact_hours = _clean(contact.get("hours"))
     contact_btn = _clean(contact.get("button_text"), "お問い合わせ")
     contact_mode = _normalize_contact_form_mode(str(contact.get("form_mode") or ""))
     contact_external_url = _clean(contact.get("external_form_url"))
 
-    recruitment = _normalize_recruitment_block(blocks.get("recruitment") if isinstance(blocks.get("recruitment"), dict) else {})
+    recruitment = _normalize_recruitment_block(_safe_dict(blocks.get("recruitment")))
     recruitment_visible = _recruitment_is_visible(recruitment)
     recruitment_badge = _clean(_recruitment_badge_text(recruitment), RECRUITMENT_BADGE_DEFAULT)
     recruitment_title = _clean(recruitment.get("title"), "採用情報")
@@ -23740,7 +24693,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
     svc_preview_has_content = bool(svc_preview_custom_image or svc_lead or svc_preview_list_html)
     svc_preview_src = ""
     if svc_preview_has_content and svc_image_url:
-        _svc_dims_preview = (_builder_preview_dims("services") if in_builder else ((1080, 608) if mode == "pc" else (860, 484)))
+        _svc_dims_preview = (_builder_preview_dims("services") if in_builder else mode_spec.image_dims)
         svc_preview_src = pv_img_src(svc_image_url, max_w=_svc_dims_preview[0], max_h=_svc_dims_preview[1], fit_mode="contain")
     services_panel_preview_html = build_services_panel_markup(
         title=svc_title,
@@ -23752,7 +24705,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
     recruitment_preview_src = ""
     recruitment_has_body = bool(recruitment_image_url or recruitment_lead or recruitment_rows)
     if recruitment_has_body and recruitment_image_url:
-        _rec_dims_preview = (_builder_preview_dims("recruitment") if in_builder else ((1080, 608) if mode == "pc" else (860, 484)))
+        _rec_dims_preview = (_builder_preview_dims("recruitment") if in_builder else mode_spec.image_dims)
         recruitment_preview_src = pv_img_src(recruitment_image_url, max_w=_rec_dims_preview[0], max_h=_rec_dims_preview[1], fit_mode="contain")
     recruitment_rows_preview_html = "".join(
         [
@@ -23770,12 +24723,13 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
     # -------- render --------
     design_profile = build_completed_hp_design_profile(step1)
     dark_class = " pv-dark" if is_dark else ""
+    theme_class = f" {_preview_theme_class(theme_style)}"
     builder_class = (" pv-preview-live pv-preview-lite pv-preview-static" if (in_builder and preview_light_images) else (" pv-preview-live" if in_builder else ""))
     design_class = completed_hp_root_class_tokens(step1)
     design_props = completed_hp_root_data_attrs(step1)
     slider_interval_ms = completed_hp_slider_interval_ms(step1)
 
-    with ui.element("div").classes(f"pv-shell pv-layout-260218 pv-mode-{mode}{dark_class}{builder_class}{design_class}").props(f'id="{root_id}" {design_props}'.strip()).style(theme_style):
+    with ui.element("div").classes(f"pv-shell pv-layout-260218 pv-mode-{mode}{dark_class}{theme_class}{builder_class}{design_class}").props(f'id="{root_id}" {design_props}'.strip()):
         # header + scroll container
         # ----- header -----
         with ui.element("header").classes("pv-topbar pv-topbar-260218"):
@@ -23797,7 +24751,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                             ui.notify("求人ページは左の「4. 求人ページ」で確認できます", type="info")
                     ui.button(recruitment_badge, on_click=_open_recruitment_notice).props("dense no-caps unelevated color=warning").classes("q-ml-sm")
 
-                if mode == "pc":
+                if mode_spec.desktop_nav:
                     # desktop nav (PC only)
                     with ui.row().classes("pv-desktop-nav items-center no-wrap"):
                         _desktop_nav_items = [
@@ -23843,7 +24797,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                         with ui.element("div").classes("pv-hero-track"):
                             for url in hero_preview_urls:
                                 with ui.element("div").classes("pv-hero-slide"):
-                                    _hero_dims = (_builder_preview_dims("hero") if in_builder else ((1080, 608) if mode == "pc" else (860, 484)))
+                                    _hero_dims = (_builder_preview_dims("hero") if in_builder else mode_spec.image_dims)
                                     ui.image(pv_img_src(url, max_w=_hero_dims[0], max_h=_hero_dims[1], fit_mode="cover")).classes("pv-hero-img")
 
                     # dots (4 dots)
@@ -23860,7 +24814,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                         ui.label(sub_catch).classes(f"pv-hero-caption-sub {_size_class(sub_catch_size)}")
 
                 # init slider (auto)
-                axis = "y" if mode == "mobile" else "x"
+                axis = mode_spec.slider_axis
                 if not (in_builder and preview_light_images):
                     ui.run_javascript(
                         f"setTimeout(function(){{try{{window.cvhbInitHeroSlider && window.cvhbInitHeroSlider('{slider_id}','{axis}',{slider_interval_ms});}}catch(e){{}}}},0);"
@@ -23877,7 +24831,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                     with ui.element("div").style("display:grid;gap:18px;"):
                         with ui.element("div").classes("pv-panel pv-panel-glass"):
                             if about_image_url:
-                                _about_dims = (_builder_preview_dims("about") if in_builder else ((1080, 608) if mode == "pc" else (860, 484)))
+                                _about_dims = (_builder_preview_dims("about") if in_builder else mode_spec.image_dims)
                                 ui.image(pv_img_src(about_image_url, max_w=_about_dims[0], max_h=_about_dims[1], fit_mode="contain")).classes("pv-about-img q-mb-sm")
 
                             if about_points:
@@ -23911,11 +24865,15 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                         ui.label("お知らせ").classes("pv-section-title")
                         ui.label("NEWS").classes("pv-section-en")
                     with ui.element("div").classes("pv-panel pv-panel-glass"):
-                        if not news_items:
-                            with ui.row().classes("items-center justify-between"):
-                                ui.label("まだお知らせがありません").classes("pv-muted")
-                        else:
-                            shown = news_items[:3] if mode == "mobile" else news_items[:4]
+                        # 一覧だけ refreshable にして、お知らせの編集では section_refs["news"] で描き直す
+                        @ui.refreshable
+                        def _news_list_view() -> None:
+                            news_items = _safe_list(_safe_dict(_safe_dict(d.get("blocks")).get("news")).get("items"))  # list[dict]
+                            if not news_items:
+                                with ui.row().classes("items-center justify-between"):
+                                    ui.label("まだお知らせがありません").classes("pv-muted")
+                                return
+                            shown = news_items[:mode_spec.news_limit]
                             with ui.element("div").classes("pv-news-list"):
                                 for it in shown:
                                     if isinstance(it, dict):
@@ -23936,6 +24894,10 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                                             c_el.classes("pv-news-empty")
                                         ui.label(title).classes("pv-news-title")
                                         ui.icon("chevron_right").classes("pv-news-arrow")
+
+                        _news_list_view()
+                        if section_refs is not None:
+                            section_refs["news"] = _news_list_view.refresh
                         with ui.row().classes("justify-end"):
                             ui.button("お知らせ一覧", on_click=lambda: None).props("flat no-caps color=primary").classes("pv-link-btn")
 
@@ -23946,9 +24908,12 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                         ui.label("FAQ").classes("pv-section-en")
 
                     with ui.element("div").classes("pv-panel pv-panel-glass"):
-                        if not faq_items:
-                            ui.label("まだFAQがありません。" if in_builder else "現在、よくある質問はありません。").classes("pv-muted")
-                        else:
+                        @ui.refreshable
+                        def _faq_list_view() -> None:
+                            faq_items = _safe_list(_safe_dict(_safe_dict(d.get("blocks")).get("faq")).get("items"))
+                            if not faq_items:
+                                ui.label("まだFAQがありません。" if in_builder else "現在、よくある質問はありません。").classes("pv-muted")
+                                return
                             with ui.element("div").classes("pv-faq-list"):
                                 for it in faq_items:
                                     if isinstance(it, dict):
@@ -23965,6 +24930,10 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                                         if a:
                                             ui.label(a).classes("pv-faq-a")
 
+                        _faq_list_view()
+                        if section_refs is not None:
+                            section_refs["faq"] = _faq_list_view.refresh
+
                 # ACCESS / CONTACT（統合）
                 with ui.element("section").classes("pv-section pv-section-260218").props('id="pv-access-contact"'):
                     with ui.element("div").classes("pv-section-head"):
@@ -23986,8 +24955,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                             if access_notes:
                                 ui.label(access_notes).classes("pv-bodytext q-mt-sm")
                             if address:
-                                _murl2 = map_url or f"https://www.google.com/maps/search/?api=1&query={quote_plus(address)}"
-                                iframe_src2 = f"https://www.google.com/maps?q={quote_plus(address)}&output=embed"
+                                iframe_src2 = google_maps_embed_url(address)
                                 map_embed_live2 = bool(map_embed and not in_builder)
                                 if map_embed_live2:
                                     with ui.element("div").classes("pv-mapframe pv-mapframe-live").props(f'data-pv-map-src="{iframe_src2}"'):
@@ -23998,14 +24966,14 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                                                 with ui.element("button").props('type="button" data-pv-map-load="1"').classes("pv-mapframe-open"):
                                                     ui.label("地図を表示")
                                 else:
-                                    with ui.element("a").props(f'href="{_murl2}" target="_blank" rel="noopener"').classes("pv-mapframe-link"):
+                                    with ui.element("a").props(f'href={map_href_prop} target="_blank" rel="noopener"').classes("pv-mapframe-link"):
                                         with ui.element("div").classes("pv-mapframe"):
                                             ui.label("MAP").classes("pv-mapframe-badge")
                                             ui.icon("place").classes("pv-mapframe-pin")
                                             with ui.element("div").classes("pv-mapframe-bottom"):
                                                 ui.label(address).classes("pv-mapframe-label")
                                                 ui.label("地図を開く").classes("pv-mapframe-open")
-                                with ui.element("a").props(f'href="{_murl2}" target="_blank" rel="noopener"').classes("pv-map-openlink"):
+                                with ui.element("a").props(f'href={map_href_prop} target="_blank" rel="noopener"').classes("pv-map-openlink"):
                                     ui.icon("open_in_new")
                                     ui.label("地図を開く（Googleマップ）")
                         with ui.element("div").classes("pv-panel pv-panel-glass pv-contact-card"):
@@ -24019,7 +24987,7 @@ def render_preview(p: dict, mode: str = "pc", *, root_id: Optional[str] = None,
                                         ui.label(contact_hours).classes("pv-muted q-mt-sm")
                                     if contact_mode == "external":
                                         if contact_external_url:
-                                            ui.button("フォームを開く").props(f'no-caps unelevated color=primary type=a href="{contact_external_url}" target="_blank" rel="noopener"').classes("pv-btn pv-btn-primary q-mt-sm")
+                                            ui.button("フォームを開く").props(f'no-caps unelevated color=primary type=a href={json.dumps(contact_external_url, ensure_ascii=False)} target="_blank" rel="noopener"').classes("pv-btn pv-btn-primary q-mt-sm")
                                             ui.label("※ 外部フォームが別タブで開きます（送信前にプライバシーポリシー同意が必要です）").classes("pv-muted q-mt-sm")
                                         else:
                                             ui.label("外部フォームURLが未入力です（左の入力で設定）").classes("pv-muted q-mt-sm")
@@ -24308,6 +25276,52 @@ def render_recruitment_page_preview(p: dict, mode: str = "pc", *, root_id: Optio
 """
     )
 
+# 作成ステップ / Step3 ブロックのタブ定義（描画のたびに組み立てない）
+BUILDER_STEP_TABS: tuple[tuple[str, str], ...] = (
+    ("s1", f"1. {ASSIST_LABEL}"),
+    ("s2", "2. 基本情報設定"),
+    ("s3", "3. ページ内容詳細設定（ブロックごと）"),
+    ("s4", "4. 求人ページ"),
+    ("s5", "5. 承認・最終チェック"),
+) + (() if HELP_MODE else (("s6", f"6. {PUBLISH_LABEL}"),))
+BUILDER_STEP_KEYS: tuple[str, ...] = tuple(k for k, _ in BUILDER_STEP_TABS)
+
+BUILDER_BLOCK_TABS: tuple[tuple[str, str], ...] = (
+    ("hero", "ヒーロー"),
+    ("philosophy", "理念/概要"),
+    ("news", "お知らせ"),
+    ("faq", "FAQ"),
+    ("access_contact", "アクセス/お問い合わせ"),
+)
+BUILDER_BLOCK_KEYS: tuple[str, ...] = tuple(k for k, _ in BUILDER_BLOCK_TABS)
+PREVIEW_MODES: tuple[str, ...] = ("mobile", "pc")
+
+# app.storage.user に覚える「今どこを編集中か」のキーと、ビルダーのDOM ID
+UI_STEP_KEY = "cvhb_ui_step"
+UI_BLOCK_KEY = "cvhb_ui_block"
+UI_PV_MODE_KEY = "cvhb_ui_preview_mode"
+BUILDER_VIEW_STATE_KEY = "cvhb_builder_main"
+BUILDER_LEFT_COL_ID = "cvhb-builder-left-col"
+# 編集後の自動保存（秒）。0 なら無効で、従来どおり「保存」ボタンだけで保存する
+BUILDER_AUTOSAVE_SEC = max(0.0, _env_float("CVHB_BUILDER_AUTOSAVE_SEC", 0.0))
+BUILDER_RIGHT_COL_ID = "cvhb-builder-right-col"
+BLOCK_PREVIEW_SECTION_IDS = {
+    "hero": "pv-top",
+    "philosophy": "pv-about",
+    "news": "pv-news",
+    "faq": "pv-faq",
+    "access_contact": "pv-access-contact",
+}
+
+
+def build_tab_strip(specs: tuple[tuple[str, str], ...], value: str, *, props: str = "", classes: str = "") -> ui.tabs:
+    """(name, label) の並びから ui.tabs を作る。"""
+    with ui.tabs(value=value).props(props).classes(classes) as tabs:
+        for name, label in specs:
+            ui.tab(name, label=label)
+    return tabs
+
+
 def render_main(u: User) -> None:
     cleanup_user_storage()
     sync_builder_shell(True)
@@ -24321,21 +25335,9 @@ def render_main(u: User) -> None:
     # - たまに接続が切れてUIが再生成されると、ステップが初期値に戻ることがある
     # - 入力内容は残っているのに「作成ステップ1」に戻る、という現象の対策
     # ---------------------------
-    UI_STEP_KEY = "cvhb_ui_step"
-    UI_BLOCK_KEY = "cvhb_ui_block"
-    UI_PV_MODE_KEY = "cvhb_ui_preview_mode"
-    BUILDER_VIEW_STATE_KEY = "cvhb_builder_main"
-    BUILDER_LEFT_COL_ID = "cvhb-builder-left-col"
-    BUILDER_RIGHT_COL_ID = "cvhb-builder-right-col"
-    BLOCK_PREVIEW_SECTION_IDS = {
-        "hero": "pv-top",
-        "philosophy": "pv-about",
-        "news": "pv-news",
-        "faq": "pv-faq",
-        "access_contact": "pv-access-contact",
-    }
+    # （キー名・DOM ID は render_main の直前にモジュール定数として置いてある）
 
-    def _ui_get(key: str, default: str, allowed: list[str]) -> str:
+    def _ui_get(key: str, default: str, allowed: "list[str] | tuple[str, ...]") -> str:
         try:
             v = app.storage.user.get(key)
             if isinstance(v, str) and v in allowed:
@@ -24348,7 +25350,7 @@ def render_main(u: User) -> None:
             pass
         return default
 
-    def _ui_set(key: str, value: str, allowed: list[str]) -> None:
+    def _ui_set(key: str, value: str, allowed: "list[str] | tuple[str, ...]") -> None:
         try:
             if isinstance(value, str) and value in allowed:
                 app.storage.user[key] = value
@@ -24409,7 +25411,12 @@ def render_main(u: User) -> None:
             pass
         return ""
 
-    preview_ref = {"refresh": (lambda: None)}
+    # sections: render_preview が返すブロック単位の refresh（{"news": fn, "faq": fn}）
+    preview_ref = {"refresh": (lambda: None), "sections": {}}
+    # refresh_preview 経由で最後に描画した入力のキー（他経路で描画したら "" に戻す）
+    preview_render_state = {"key": ""}
+    # デバウンス中にたまった更新要求（ブロック単位で済むもの / 全体の描き直しが要るか）
+    preview_pending = {"blocks": set(), "full": False}
 
     editor_ref = {"refresh": (lambda: None)}
 
@@ -24439,15 +25446,41 @@ def render_main(u: User) -> None:
         except Exception:
             return 0.55
 
-    def refresh_preview(force: bool = False) -> None:
-        """プレビュー更新（デバウンス対応）"""
+    def refresh_preview(force: bool = False, block_key: str = "") -> None:
+        """プレビュー更新（デバウンス対応）
+
+        block_key を付けた要求だけがたまっていて、そのブロックの refresh が登録済みなら、一覧部分だけ描き直す。
+        """
         nonlocal _preview_refresh_handle
+        if block_key and not force:
+            preview_pending["blocks"].add(block_key)
+        else:
+            preview_pending["full"] = True
 
         def _do_refresh() -> None:
             nonlocal _preview_refresh_handle
             _preview_refresh_handle = None
+            full = preview_pending["full"]
+            pending_blocks = tuple(preview_pending["blocks"])
+            preview_pending["full"] = False
+            preview_pending["blocks"].clear()
+            key = preview_content_key(p, _current_step_value(), _ui_get(UI_PV_MODE_KEY, "mobile", PREVIEW_MODES))
+            # 入力が前回描画と同じなら、要素ツリーの作り直しを省略する
+            if key and not force and key == preview_render_state["key"]:
+                return
+            sections = preview_ref.get("sections") or {}
+            if not full and pending_blocks and all(k in sections for k in pending_blocks):
+                try:
+                    for k in pending_blocks:
+                        sections[k]()
+                    preview_render_state["key"] = key
+                    restore_builder_view_state(70)
+                    return
+                except Exception:
+                    pass  # 部分更新に失敗したら全体を描き直す
             try:
                 preview_ref["refresh"]()
+                preview_render_state["key"] = key
             except Exception:
                 pass
             restore_builder_view_state(70)
@@ -24581,32 +25614,56 @@ def render_main(u: User) -> None:
         except Exception:
             pass
 
-    save_state = {"busy": False}
+    # rev: 編集のたびに +1 / saved_rev: 最後に保存できた時点の rev（違えば未保存の編集がある）
+    save_state = {"busy": False, "rev": 0, "saved_rev": 0, "autosave_off": False}
 
-    async def save_now() -> None:
+    async def save_now(*, auto: bool = False) -> None:
         nonlocal p
         if not p:
-            ui.notify("案件が選択されていません", type="warning")
+            if not auto:
+                ui.notify("案件が選択されていません", type="warning")
             return
         if save_state["busy"]:
             return
         save_state["busy"] = True
+        rev = save_state["rev"]
         try:
-            ui.notify("保存しています...", type="info")
+            if not auto:
+                ui.notify("保存しています...", type="info")
 
             def _save_work(project_obj: dict, user_obj: User) -> None:
                 save_project_to_sftp(_clone_json_data(project_obj), user_obj)
 
             await asyncio.wait_for(asyncio.to_thread(_save_work, p, u), timeout=15.0)
             set_current_project(p, u)
-            ui.notify("保存しました（project.json）", type="positive")
+            save_state["saved_rev"] = rev
+            if rev == save_state["rev"]:
+                PROJECT_CACHE.mark_clean(u.id)
+            if not auto:
+                ui.notify("保存しました（project.json）", type="positive")
         except asyncio.TimeoutError:
+            if auto:
+                save_state["autosave_off"] = True
             ui.notify("保存がタイムアウトしました。通信状況を確認して再試行してください。", type="warning")
         except Exception as e:
-            ui.notify(f"保存に失敗しました: {sanitize_error_text(e)}", type="negative")
+            if auto:
+                # 権限・ロック中など、続けても通らないことが多いので自動保存はこの画面では止める
+                save_state["autosave_off"] = True
+                ui.notify(f"自動保存できませんでした（「保存」ボタンで保存してください）: {sanitize_error_text(e)}", type="warning")
+            else:
+                ui.notify(f"保存に失敗しました: {sanitize_error_text(e)}", type="negative")
         finally:
             save_state["busy"] = False
 
+    async def _autosave_tick() -> None:
+        # 間隔内の編集はまとめて1回の保存にする
+        if save_state["autosave_off"] or save_state["busy"] or save_state["rev"] == save_state["saved_rev"]:
+            return
+        await save_now(auto=True)
+
+    if p and BUILDER_AUTOSAVE_SEC > 0:
+        ui.timer(BUILDER_AUTOSAVE_SEC, _autosave_tick)
+
     with ui.element("div").classes("cvhb-page"):
         with ui.element("div").classes("cvhb-container"):
             with ui.element("div").classes("cvhb-split"):
@@ -24644,17 +25701,10 @@ def render_main(u: User) -> None:
                             ui.label("ステップを選ぶと、下の入力画面が切り替わります。").classes("cvhb-muted q-mb-sm")
 
                             # UIの「今のステップ」を覚える（接続が切れても戻らないように）
-                            allowed_steps = ["s1", "s2", "s3", "s4", "s5"] + ([] if HELP_MODE else ["s6"])
+                            allowed_steps = BUILDER_STEP_KEYS
                             step_initial = _ui_get(UI_STEP_KEY, "s1", allowed_steps)
 
-                            with ui.tabs(value=step_initial).props("vertical dense").classes("w-full cvhb-step-tabs") as step_tabs:
-                                ui.tab("s1", label=f"1. {ASSIST_LABEL}")
-                                ui.tab("s2", label="2. 基本情報設定")
-                                ui.tab("s3", label="3. ページ内容詳細設定（ブロックごと）")
-                                ui.tab("s4", label="4. 求人ページ")
-                                ui.tab("s5", label="5. 承認・最終チェック")
-                                if not HELP_MODE:
-                                    ui.tab("s6", label=f"6. {PUBLISH_LABEL}")
+                            step_tabs = build_tab_strip(BUILDER_STEP_TABS, step_initial, props="vertical dense", classes="w-full cvhb-step-tabs")
 
                             step_content_ref = {"refresh": (lambda: None)}
 
@@ -24707,15 +25757,25 @@ def render_main(u: User) -> None:
                                         pass
                                     restore_builder_view_state(50)
 
-                                def schedule_preview_refresh(*, force: bool = False) -> None:
-                                    refresh_preview(force=force)
+                                def schedule_preview_refresh(*, force: bool = False, block_key: str = "") -> None:
+                                    refresh_preview(force=force, block_key=block_key)
 
                                 def schedule_visible_side_panels_refresh(*, force: bool = False) -> None:
                                     refresh_approval_panel(force=force)
                                     refresh_publish_panel(force=force)
 
-                                def update_and_refresh(*, structure_changed: bool = False, force_preview: bool = False, delta_preview_key: str = "") -> None:
+                                def update_and_refresh(
+                                    *,
+                                    structure_changed: bool = False,
+                                    force_preview: bool = False,
+                                    delta_preview_key: str = "",
+                                    preview_block: str = "",
+                                ) -> None:
+                                    """preview_block: 変更がそのブロックの中だけなら指定（プレビューはその部分だけ描き直せる）。"""
+                                    save_state["rev"] += 1
                                     template_changed = sync_project_state_only()
+                                    # 未保存の編集を持つ間は PROJECT_CACHE の期限切れで捨てられないようにする
+                                    PROJECT_CACHE.mark_dirty(u.id)
                                     structure_now = bool(structure_changed or template_changed)
                                     capture_builder_view_state(include_focus=not structure_now)
                                     refresh_block_editor_if_structure_changed(structure_now)
@@ -24723,7 +25783,7 @@ def render_main(u: User) -> None:
                                     if (not structure_now) and (not force_preview) and delta_preview_key == "theme":
                                         preview_updated = apply_preview_theme_delta()
                                     if not preview_updated:
-                                        schedule_preview_refresh(force=force_preview)
+                                        schedule_preview_refresh(force=force_preview, block_key="" if template_changed else preview_block)
                                     schedule_visible_side_panels_refresh(force=force_preview)
 
                                 async def force_preview_refresh_and_save() -> None:
@@ -24731,61 +25791,94 @@ def render_main(u: User) -> None:
                                     await save_now()
 
                                 def bind_step2_input(label: str, key: str, hint: str = "") -> None:
-                                    val = step2.get(key, "")
-                                    def _on_change(e):
-                                        next_value = e.value or ""
-                                        if str(step2.get(key) or "") == str(next_value):
-                                            return
-                                        step2[key] = next_value
-                                        update_and_refresh()
-                                    inp = ui.input(label, value=val, on_change=_on_change).props("outlined dense").classes("w-full q-mb-sm")
-                                    if hint:
-                                        inp.props(f"hint={hint}")
+                                    std_input(label, step2.get(key, ""), partial(_set_dict_from_input, step2, key, update_and_refresh), dense=True, hint=hint)
 
                                 def update_block(block_key: str, field: str, value) -> None:
                                     b = blocks.setdefault(block_key, {})
                                     if b.get(field) == value:
                                         return
                                     b[field] = value
-                                    update_and_refresh()
+                                    update_and_refresh(preview_block=block_key)
 
                                 def bind_block_input(block_key: str, label: str, field: str, *, textarea: bool = False, hint: str = "") -> None:
+                                    # ブロックの dict は作成時に1回だけ取り、入力ごとの setdefault / update_block を通さない
+                                    # （blocks.clear() は Step1 の業種変更だけで、そのとき Step3 の入力欄は表示されていない）
                                     b = blocks.setdefault(block_key, {})
-                                    val = b.get(field, "")
-                                    def _on_change(e):
-                                        next_value = e.value or ""
-                                        if b.get(field, "") == next_value:
-                                            return
-                                        update_block(block_key, field, next_value)
-                                    props = "outlined"
-                                    if textarea:
-                                        props += " type=textarea autogrow"
-                                    inp = ui.input(label, value=val, on_change=_on_change).props(props).classes("w-full q-mb-sm")
-                                    if hint:
-                                        inp.props(f"hint={hint}")
+                                    std_input(label, b.get(field, ""), partial(_set_dict_from_input, b, field, partial(update_and_refresh, preview_block=block_key)), textarea=textarea, hint=hint)
 
                                 def bind_dict_input(target: dict, label: str, field: str, *, textarea: bool = False, hint: str = "") -> None:
                                     """Bind ui.input directly to a dict field (used for nested blocks like philosophy/services)."""
                                     if not isinstance(target, dict):
                                         return
-                                    val = target.get(field, "")
-
-                                    def _on_change(e):
-                                        next_value = e.value or ""
-                                        try:
-                                            if target.get(field, "") == next_value:
-                                                return
-                                            target[field] = next_value
-                                        except Exception:
-                                            pass
-                                        update_and_refresh()
+                                    std_input(label, target.get(field, ""), partial(_set_dict_from_input, target, field, update_and_refresh), textarea=textarea, hint=hint)
+
+                                def entry_card_list(items: list, *, block_key: str, title_prefix: str, empty_text: str, new_item, insert_top: bool, render_fields) -> None:
+                                    """お知らせ / FAQ のような「カード1枚＝1件」の編集リスト。
+
+                                    追加・削除はそのカードだけを作る / 消す（一覧全体や Step3 パネルは作り直さない）。
+                                    入力欄のハンドラは index ではなく item 自体に結び付けるので、削除で番号がずれても正しい行を書き換える。
+                                    """
+                                    cards: dict[int, tuple] = {}  # id(item) -> (card, 見出しラベル)
+
+                                    def _index_of(item: dict) -> int:
+                                        for n, it in enumerate(items):
+                                            if it is item:
+                                                return n
+                                        return -1
+
+                                    def _renumber() -> None:
+                                        for n, it in enumerate(items):
+                                            ref = cards.get(id(it))
+                                            if ref:
+                                                ref[1].set_text(f"{title_prefix} #{n+1}")
+                                        empty_label.set_visibility(not items)
+                                        list_box.set_visibility(bool(items))
+
+                                    def set_field(item: dict, key: str, val: str) -> None:
+                                        if item.get(key) == val or _index_of(item) < 0:
+                                            return
+                                        item[key] = val
+                                        update_and_refresh(preview_block=block_key)
 
-                                    props = "outlined"
-                                    if textarea:
-                                        props += " type=textarea autogrow"
-                                    inp = ui.input(label, value=val, on_change=_on_change).props(props).classes("w-full q-mb-sm")
-                                    if hint:
-                                        inp.props(f"hint={hint}")
+                                    def delete_item(item: dict) -> None:
+                                        n = _index_of(item)
+                                        if n < 0:
+                                            return
+                                        del items[n]
+                                        ref = cards.pop(id(item), None)
+                                        if ref:
+                                            ref[0].delete()
+                                        _renumber()
+                                        update_and_refresh(preview_block=block_key)
+
+                                    def build_card(item: dict, n: int):
+                                        with list_box:
+                                            with ui.card().classes("w-full q-pa-md q-mb-sm rounded-borders cvhb-entry-card").props("flat bordered") as card:
+                                                with ui.row().classes("items-center justify-between"):
+                                                    head = ui.label(f"{title_prefix} #{n+1}").classes("text-body1")
+                                                    ui.button("削除", on_click=partial(delete_item, item)).props("flat color=negative")
+                                                render_fields(item, set_field)
+                                        cards[id(item)] = (card, head)
+                                        return card
+
+                                    def add_item() -> None:
+                                        item = new_item()
+                                        if insert_top:
+                                            items.insert(0, item)
+                                            build_card(item, 0).move(list_box, target_index=0)
+                                        else:
+                                            items.append(item)
+                                            build_card(item, len(items) - 1)
+                                        _renumber()
+                                        update_and_refresh(preview_block=block_key)
+
+                                    ui.button("＋ 追加", on_click=add_item).props("color=primary outline").classes("q-mb-sm")
+                                    empty_label = ui.label(empty_text).classes("cvhb-muted")
+                                    list_box = ui.column().classes("w-full")
+                                    for n, it in enumerate(items):
+                                        build_card(it, n)
+                                    empty_label.set_visibility(not items)
+                                    list_box.set_visibility(bool(items))
 
                                 def render_recruitment_page_editor() -> None:
                                     """求人ページ専用の編集画面。HP本体ブロックとは分けて扱う。"""
@@ -24970,120 +26063,104 @@ def render_main(u: User) -> None:
                                             ui.label("※作成途中の業種変更は、3.ページ内容詳細設定（ブロックごと）がリセットされます。").classes("text-negative text-caption q-mb-sm")
 
                                             @ui.refreshable
-                                            def industry_selector():
-                                                current_industry = step1.get("industry", "会社サイト（企業）")
-
-                                                def set_industry(value: str) -> None:
-                                                    # 業種変更でテンプレが変わる場合は、Step3（ブロック編集）をリセットする
-                                                    prev_tpl = step1.get("_applied_template_id") or step1.get("template_id") or resolve_template_id(step1) or ""
+                                            def welfare_selector():
+                                                # 福祉事業所の追加分岐（入所/通所/児童など）
+                                                if step1.get("industry", "会社サイト（企業）") != "福祉事業所":
+                                                    return
+                                                ui.separator().classes("q-my-sm")
+                                                ui.label("福祉事業所のタイプ").classes("text-subtitle2")
+                                                ui.label("「介護/障がい/児童」と「入所/通所」を選びます。").classes("cvhb-muted")
 
-                                                    step1["industry"] = value
-
-                                                    # 福祉事業所だけ追加分岐（初期値を入れる）
-                                                    if value == "福祉事業所":
-                                                        step1["welfare_domain"] = step1.get("welfare_domain") or WELFARE_DOMAIN_PRESETS[0]["value"]
-                                                        step1["welfare_mode"] = step1.get("welfare_mode") or WELFARE_MODE_PRESETS[0]["value"]
-                                                    else:
-                                                        # 福祉以外は空にする
-                                                        step1["welfare_domain"] = ""
-                                                        step1["welfare_mode"] = ""
+                                                # 初期値（業種選択直後でも必ず表示されるように）
+                                                current_domain = step1.get("welfare_domain") or WELFARE_DOMAIN_PRESETS[0]["value"]
+                                                current_mode = step1.get("welfare_mode") or WELFARE_MODE_PRESETS[0]["value"]
 
+                                                def set_domain(v: str) -> None:
+                                                    prev_tpl = step1.get("_applied_template_id") or step1.get("template_id") or resolve_template_id(step1) or ""
+                                                    step1["welfare_domain"] = v
                                                     step1["template_id"] = resolve_template_id(step1)
                                                     next_tpl = step1.get("template_id") or ""
+                                                    if next_tpl and next_tpl != prev_tpl:
+                                                        try:
+                                                            blocks.clear()
+                                                        except Exception:
+                                                            pass
+                                                    update_and_refresh()
+                                                    select_domain(v)
 
+                                                def set_mode(v: str) -> None:
+                                                    prev_tpl = step1.get("_applied_template_id") or step1.get("template_id") or resolve_template_id(step1) or ""
+                                                    step1["welfare_mode"] = v
+                                                    step1["template_id"] = resolve_template_id(step1)
+                                                    next_tpl = step1.get("template_id") or ""
                                                     if next_tpl and next_tpl != prev_tpl:
                                                         try:
                                                             blocks.clear()
                                                         except Exception:
                                                             pass
-                                                        update_and_refresh()
-                                                    industry_selector.refresh()
-
-                                                for opt in INDUSTRY_PRESETS:
-                                                    selected = (opt["value"] == current_industry)
-                                                    card = ui.card().classes(
-                                                        "q-pa-sm q-mb-xs cvhb-choice " + ("is-selected" if selected else "")
-                                                    ).props("flat bordered").style("width: 100%;")
-                                                    with card:
-                                                        with ui.row().classes("items-start justify-between"):
-                                                            with ui.column().classes("q-gutter-xs"):
-                                                                ui.label(opt["label"]).classes("text-body1")
-                                                                ui.label(opt["features"]).classes("cvhb-muted")
-                                                            if selected:
-                                                                ui.icon("check_circle").classes("text-primary")
-                                                    card.on("click", lambda e, v=opt["value"]: set_industry(v))
+                                                    update_and_refresh()
+                                                    select_mode(v)
 
-                                                # 福祉事業所の追加分岐（入所/通所/児童など）
-                                                if current_industry == "福祉事業所":
-                                                    ui.separator().classes("q-my-sm")
-                                                    ui.label("福祉事業所のタイプ").classes("text-subtitle2")
-                                                    ui.label("「介護/障がい/児童」と「入所/通所」を選びます。").classes("cvhb-muted")
-
-                                                    # 初期値（業種選択直後でも必ず表示されるように）
-                                                    current_domain = step1.get("welfare_domain") or WELFARE_DOMAIN_PRESETS[0]["value"]
-                                                    current_mode = step1.get("welfare_mode") or WELFARE_MODE_PRESETS[0]["value"]
-
-                                                    def set_domain(v: str) -> None:
-                                                        prev_tpl = step1.get("_applied_template_id") or step1.get("template_id") or resolve_template_id(step1) or ""
-                                                        step1["welfare_domain"] = v
-                                                        step1["template_id"] = resolve_template_id(step1)
-                                                        next_tpl = step1.get("template_id") or ""
-                                                        if next_tpl and next_tpl != prev_tpl:
-                                                            try:
-                                                                blocks.clear()
-                                                            except Exception:
-                                                                pass
-                                                        update_and_refresh()
-                                                        industry_selector.refresh()
-
-                                                    def set_mode(v: str) -> None:
-                                                        prev_tpl = step1.get("_applied_template_id") or step1.get("template_id") or resolve_template_id(step1) or ""
-                                                        step1["welfare_mode"] = v
-                                                        step1["template_id"] = resolve_template_id(step1)
-                                                        next_tpl = step1.get("template_id") or ""
-                                                        if next_tpl and next_tpl != prev_tpl:
-                                                            try:
-                                                                blocks.clear()
-                                                            except Exception:
-                                                                pass
-                                                        update_and_refresh()
-                                                        industry_selector.refresh()
+                                                def _welfare_body(x: dict):
+                                                    with ui.row().classes("items-start justify-between") as row:
+                                                        with ui.column().classes("q-gutter-xs"):
+                                                            ui.label(x["label"]).classes("text-body1")
+                                                            ui.label(x["hint"]).classes("cvhb-muted")
+                                                    return row
 
-                                                    ui.label("サービス種別").classes("text-body2 q-mt-sm")
-                                                    with ui.column().classes("q-gutter-xs"):
-                                                        for x in WELFARE_DOMAIN_PRESETS:
-                                                            selected = x["value"] == current_domain
-                                                            cls = "cvhb-choice q-pa-sm rounded-borders w-full"
-                                                            if selected:
-                                                                cls += " is-selected"
-                                                            c = ui.card().classes(cls).props("flat bordered")
-                                                            with c:
-                                                                with ui.row().classes("items-start justify-between"):
-                                                                    with ui.column().classes("q-gutter-xs"):
-                                                                        ui.label(x["label"]).classes("text-body1")
-                                                                        ui.label(x["hint"]).classes("cvhb-muted")
-                                                                    if selected:
-                                                                        ui.icon("check_circle").classes("text-primary")
-                                                            c.on("click", lambda e, v=x["value"]: set_domain(v))
-
-                                                    ui.label("提供形態").classes("text-body2 q-mt-sm")
+                                                ui.label("サービス種別").classes("text-body2 q-mt-sm")
+                                                with ui.column().classes("q-gutter-xs"):
+                                                    select_domain = build_choice_cards(
+                                                        WELFARE_DOMAIN_PRESETS, current_domain, set_domain, _welfare_body,
+                                                        card_classes="cvhb-choice q-pa-sm rounded-borders w-full", card_style="",
+                                                    )
+
+                                                ui.label("提供形態").classes("text-body2 q-mt-sm")
+                                                with ui.column().classes("q-gutter-xs"):
+                                                    select_mode = build_choice_cards(
+                                                        WELFARE_MODE_PRESETS, current_mode, set_mode, _welfare_body,
+                                                        card_classes="cvhb-choice q-pa-sm rounded-borders w-full", card_style="",
+                                                    )
+
+                                            def set_industry(value: str) -> None:
+                                                # 業種変更でテンプレが変わる場合は、Step3（ブロック編集）をリセットする
+                                                prev_tpl = step1.get("_applied_template_id") or step1.get("template_id") or resolve_template_id(step1) or ""
+                                                prev_industry = step1.get("industry", "会社サイト（企業）")
+
+                                                step1["industry"] = value
+
+                                                # 福祉事業所だけ追加分岐（初期値を入れる）
+                                                if value == "福祉事業所":
+                                                    step1["welfare_domain"] = step1.get("welfare_domain") or WELFARE_DOMAIN_PRESETS[0]["value"]
+                                                    step1["welfare_mode"] = step1.get("welfare_mode") or WELFARE_MODE_PRESETS[0]["value"]
+                                                else:
+                                                    # 福祉以外は空にする
+                                                    step1["welfare_domain"] = ""
+                                                    step1["welfare_mode"] = ""
+
+                                                step1["template_id"] = resolve_template_id(step1)
+                                                next_tpl = step1.get("template_id") or ""
+
+                                                if next_tpl and next_tpl != prev_tpl:
+                                                    try:
+                                                        blocks.clear()
+                                                    except Exception:
+                                                        pass
+                                                    update_and_refresh()
+                                                # カードは選択表示の切替だけ。福祉の追加分岐は出し入れが変わるときだけ作り直す
+                                                select_industry(value)
+                                                if "福祉事業所" in (prev_industry, value):
+                                                    welfare_selector.refresh()
+
+                                            def _industry_body(opt: dict):
+                                                with ui.row().classes("items-start justify-between") as row:
                                                     with ui.column().classes("q-gutter-xs"):
-                                                        for x in WELFARE_MODE_PRESETS:
-                                                            selected = x["value"] == current_mode
-                                                            cls = "cvhb-choice q-pa-sm rounded-borders w-full"
-                                                            if selected:
-                                                                cls += " is-selected"
-                                                            c = ui.card().classes(cls).props("flat bordered")
-                                                            with c:
-                                                                with ui.row().classes("items-start justify-between"):
-                                                                    with ui.column().classes("q-gutter-xs"):
-                                                                        ui.label(x["label"]).classes("text-body1")
-                                                                        ui.label(x["hint"]).classes("cvhb-muted")
-                                                                    if selected:
-                                                                        ui.icon("check_circle").classes("text-primary")
-                                                            c.on("click", lambda e, v=x["value"]: set_mode(v))
+                                                        ui.label(opt["label"]).classes("text-body1")
+                                                        ui.label(opt["features"]).classes("cvhb-muted")
+                                                return row
 
-                                            industry_selector()
+                                            select_industry = build_choice_cards(INDUSTRY_PRESETS, step1.get("industry", "会社サイト（企業）"), set_industry, _industry_body)
+                                            welfare_selector()
 
 
 
@@ -25091,154 +26168,74 @@ def render_main(u: User) -> None:
                                             ui.label("背景の濃さを選んでください").classes("text-subtitle1")
                                             ui.label("背景の柄と動きの見え方を 弱 / 中（初期設定・おすすめ） / 強 で選べます。初期設定は「中（初期設定・おすすめ）」です。" ).classes("cvhb-muted q-mb-sm")
 
-                                            @ui.refreshable
-                                            def bg_strength_selector():
-                                                current_strength = _normalize_bg_strength(step1.get("bg_strength") or "medium")
-
-                                                def set_bg_strength(value: str) -> None:
-                                                    step1["bg_strength"] = _normalize_bg_strength(value)
-                                                    update_and_refresh(delta_preview_key="theme")
-                                                    bg_strength_selector.refresh()
-
-                                                for opt in BG_STRENGTH_PRESETS:
-                                                    selected = (opt["value"] == current_strength)
-                                                    card = ui.card().classes(
-                                                        "q-pa-sm q-mb-xs cvhb-choice " + ("is-selected" if selected else "")
-                                                    ).props("flat bordered").style("width: 100%;")
-                                                    with card:
-                                                        with ui.row().classes("items-center justify-between"):
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["label"]).classes("text-body1")
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["hint"]).classes("cvhb-muted")
-                                                                if selected:
-                                                                    ui.icon("check_circle").classes("text-primary")
-                                                    card.on("click", lambda e, v=opt["value"]: set_bg_strength(v))
+                                            def _label_hint_choice_body(opt: dict):
+                                                with ui.row().classes("items-center justify-between"):
+                                                    with ui.row().classes("items-center q-gutter-sm"):
+                                                        ui.label(opt["label"]).classes("text-body1")
+                                                    with ui.row().classes("items-center q-gutter-sm") as right:
+                                                        ui.label(opt["hint"]).classes("cvhb-muted")
+                                                return right
+
+                                            def set_bg_strength(value: str) -> None:
+                                                step1["bg_strength"] = _normalize_bg_strength(value)
+                                                update_and_refresh(delta_preview_key="theme")
+                                                select_bg_strength(step1["bg_strength"])
 
-                                            bg_strength_selector()
+                                            select_bg_strength = build_choice_cards(BG_STRENGTH_PRESETS, _normalize_bg_strength(step1.get("bg_strength") or "medium"), set_bg_strength, _label_hint_choice_body)
 
                                         with ui.card().classes("q-pa-sm rounded-borders w-full q-mb-sm").props("flat bordered"):
                                             ui.label("背景の動きを選んでください").classes("text-subtitle1")
                                             ui.label("背景の動く量と速さを 弱 / 中（初期設定・おすすめ） / 強 で選べます。表示サイズからはみ出さないように抑えつつ調整します。" ).classes("cvhb-muted q-mb-sm")
 
-                                            @ui.refreshable
-                                            def bg_motion_selector():
-                                                current_motion = _normalize_bg_motion(step1.get("bg_motion") or "medium")
-
-                                                def set_bg_motion(value: str) -> None:
-                                                    step1["bg_motion"] = _normalize_bg_motion(value)
-                                                    update_and_refresh(delta_preview_key="theme")
-                                                    bg_motion_selector.refresh()
-
-                                                for opt in BG_MOTION_PRESETS:
-                                                    selected = (opt["value"] == current_motion)
-                                                    card = ui.card().classes(
-                                                        "q-pa-sm q-mb-xs cvhb-choice " + ("is-selected" if selected else "")
-                                                    ).props("flat bordered").style("width: 100%;")
-                                                    with card:
-                                                        with ui.row().classes("items-center justify-between"):
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["label"]).classes("text-body1")
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["hint"]).classes("cvhb-muted")
-                                                                if selected:
-                                                                    ui.icon("check_circle").classes("text-primary")
-                                                    card.on("click", lambda e, v=opt["value"]: set_bg_motion(v))
+                                            def set_bg_motion(value: str) -> None:
+                                                step1["bg_motion"] = _normalize_bg_motion(value)
+                                                update_and_refresh(delta_preview_key="theme")
+                                                select_bg_motion(step1["bg_motion"])
 
-                                            bg_motion_selector()
+                                            select_bg_motion = build_choice_cards(BG_MOTION_PRESETS, _normalize_bg_motion(step1.get("bg_motion") or "medium"), set_bg_motion, _label_hint_choice_body)
 
                                         with ui.card().classes("q-pa-sm rounded-borders w-full q-mb-sm").props("flat bordered"):
                                             ui.label("完成HPのUI濃さを選んでください").classes("text-subtitle1")
                                             ui.label("今後の一括デザイン変更でも使う土台です。枠・影・ガラス感の濃さを 弱 / 中 / 強 で選べます。" ).classes("cvhb-muted q-mb-sm")
 
-                                            @ui.refreshable
-                                            def ui_strength_selector():
-                                                current_ui_strength = _normalize_ui_strength(step1.get("ui_strength") or step1.get("bg_strength") or "medium")
-
-                                                def set_ui_strength(value: str) -> None:
-                                                    step1["ui_strength"] = _normalize_ui_strength(value)
-                                                    update_and_refresh(delta_preview_key="theme")
-                                                    ui_strength_selector.refresh()
-
-                                                for opt in UI_STRENGTH_PRESETS:
-                                                    selected = (opt["value"] == current_ui_strength)
-                                                    card = ui.card().classes(
-                                                        "q-pa-sm q-mb-xs cvhb-choice " + ("is-selected" if selected else "")
-                                                    ).props("flat bordered").style("width: 100%;")
-                                                    with card:
-                                                        with ui.row().classes("items-center justify-between"):
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["label"]).classes("text-body1")
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["hint"]).classes("cvhb-muted")
-                                                                if selected:
-                                                                    ui.icon("check_circle").classes("text-primary")
-                                                    card.on("click", lambda e, v=opt["value"]: set_ui_strength(v))
+                                            def set_ui_strength(value: str) -> None:
+                                                step1["ui_strength"] = _normalize_ui_strength(value)
+                                                update_and_refresh(delta_preview_key="theme")
+                                                select_ui_strength(step1["ui_strength"])
 
-                                            ui_strength_selector()
+                                            select_ui_strength = build_choice_cards(UI_STRENGTH_PRESETS, _normalize_ui_strength(step1.get("ui_strength") or step1.get("bg_strength") or "medium"), set_ui_strength, _label_hint_choice_body)
 
                                         with ui.card().classes("q-pa-sm rounded-borders w-full q-mb-sm").props("flat bordered"):
                                             ui.label("完成HPのUI動きを選んでください").classes("text-subtitle1")
                                             ui.label("今後の一括デザイン変更でも使う土台です。スクロール表示・折りたたみ・自動演出の動きを 弱 / 中 / 強 で選べます。" ).classes("cvhb-muted q-mb-sm")
 
-                                            @ui.refreshable
-                                            def ui_motion_selector():
-                                                current_ui_motion = _normalize_ui_motion(step1.get("ui_motion") or step1.get("bg_motion") or "medium")
-
-                                                def set_ui_motion(value: str) -> None:
-                                                    step1["ui_motion"] = _normalize_ui_motion(value)
-                                                    update_and_refresh(delta_preview_key="theme")
-                                                    ui_motion_selector.refresh()
-
-                                                for opt in UI_MOTION_PRESETS:
-                                                    selected = (opt["value"] == current_ui_motion)
-                                                    card = ui.card().classes(
-                                                        "q-pa-sm q-mb-xs cvhb-choice " + ("is-selected" if selected else "")
-                                                    ).props("flat bordered").style("width: 100%;")
-                                                    with card:
-                                                        with ui.row().classes("items-center justify-between"):
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["label"]).classes("text-body1")
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(opt["hint"]).classes("cvhb-muted")
-                                                                if selected:
-                                                                    ui.icon("check_circle").classes("text-primary")
-                                                    card.on("click", lambda e, v=opt["value"]: set_ui_motion(v))
+                                            def set_ui_motion(value: str) -> None:
+                                                step1["ui_motion"] = _normalize_ui_motion(value)
+                                                update_and_refresh(delta_preview_key="theme")
+                                                select_ui_motion(step1["ui_motion"])
 
-                                            ui_motion_selector()
+                                            select_ui_motion = build_choice_cards(UI_MOTION_PRESETS, _normalize_ui_motion(step1.get("ui_motion") or step1.get("bg_motion") or "medium"), set_ui_motion, _label_hint_choice_body)
 
                                         # Color
                                         with ui.card().classes("q-pa-sm rounded-borders w-full cvhb-edit-card").props("flat bordered"):
                                             ui.label("ページカラー（テーマ色）を選んでください").classes("text-subtitle1")
                                             ui.label("ヘッダー・ボタン・アイコンなどの雰囲気が変わります。").classes("cvhb-muted q-mb-sm")
 
-                                            @ui.refreshable
-                                            def color_selector():
-                                                current_color = step1.get("primary_color", "blue")
-
-                                                def set_color(value: str) -> None:
-                                                    step1["primary_color"] = value
-                                                    update_and_refresh(delta_preview_key="theme")
-                                                    color_selector.refresh()
-
-                                                for opt in COLOR_PRESETS:
-                                                    selected = (opt["value"] == current_color)
-                                                    sw = COLOR_HEX.get(opt["value"], "#999")
-                                                    card = ui.card().classes(
-                                                        "q-pa-sm q-mb-xs cvhb-choice " + ("is-selected" if selected else "")
-                                                    ).props("flat bordered").style("width: 100%;")
-                                                    with card:
-                                                        with ui.row().classes("items-center justify-between"):
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.element("span").classes("cvhb-swatch").style(f"background:{sw};")
-                                                                ui.label(f"{opt['label']}").classes("text-body1")
-                                                            with ui.row().classes("items-center q-gutter-sm"):
-                                                                ui.label(f"印象：{opt['impression']}").classes("cvhb-muted")
-                                                                if selected:
-                                                                    ui.icon("check_circle").classes("text-primary")
-                                                    card.on("click", lambda e, v=opt["value"]: set_color(v))
+                                            def set_color(value: str) -> None:
+                                                step1["primary_color"] = value
+                                                update_and_refresh(delta_preview_key="theme")
+                                                select_color(value)
 
-                                            color_selector()
+                                            def _color_body(opt: dict):
+                                                with ui.row().classes("items-center justify-between"):
+                                                    with ui.row().classes("items-center q-gutter-sm"):
+                                                        ui.element("span").classes("cvhb-swatch").style(opt["swatch_style"])
+                                                        ui.label(opt["label"]).classes("text-body1")
+                                                    with ui.row().classes("items-center q-gutter-sm") as right:
+                                                        ui.label(opt["impression_text"]).classes("cvhb-muted")
+                                                return right
+
+                                            select_color = build_choice_cards(COLOR_CHOICE_ITEMS, step1.get("primary_color", "blue"), set_color, _color_body)
 
                                     # -----------------
                                     # Step 2
@@ -25360,15 +26357,10 @@ def render_main(u: User) -> None:
                                                 ui.label("ヒーロー / 理念・概要 / お知らせ / FAQ / アクセス・お問い合わせ").classes("cvhb-muted q-mb-sm")
 
                                                 # UIの「今のブロック」を覚える（接続が切れても戻らないように）
-                                                allowed_blocks = ["hero", "philosophy", "news", "faq", "access_contact"]
+                                                allowed_blocks = BUILDER_BLOCK_KEYS
                                                 block_initial = _ui_get(UI_BLOCK_KEY, "hero", allowed_blocks)
 
-                                                with ui.tabs(value=block_initial).props("dense").classes("w-full cvhb-block-tabs") as block_tabs:
-                                                    ui.tab("hero", label="ヒーロー")
-                                                    ui.tab("philosophy", label="理念/概要")
-                                                    ui.tab("news", label="お知らせ")
-                                                    ui.tab("faq", label="FAQ")
-                                                    ui.tab("access_contact", label="アクセス/お問い合わせ")
+                                                block_tabs = build_tab_strip(BUILDER_BLOCK_TABS, block_initial, props="dense", classes="w-full cvhb-block-tabs")
 
                                                 block_content_ref = {"refresh": (lambda: None)}
 
@@ -25378,7 +26370,7 @@ def render_main(u: User) -> None:
                                                         _ui_set(UI_BLOCK_KEY, v, allowed_blocks)
                                                         capture_builder_view_state(include_focus=False)
                                                         try:
-                                                            block_content_ref["refresh"]()
+                                                            block_content_ref["show"](v)
                                                         except Exception:
                                                             pass
                                                         restore_builder_view_state(40)
@@ -25389,9 +26381,7 @@ def render_main(u: User) -> None:
                                                 except Exception:
                                                     pass
 
-                                                @ui.refreshable
-                                                def block_content_panel():
-                                                    current_block = _ui_get(UI_BLOCK_KEY, "hero", allowed_blocks)
+                                                def block_content_panel(current_block: str):
                                                     # active block only (lazy mount)
 
                                                     if current_block == "hero":
@@ -25409,7 +26399,10 @@ def render_main(u: User) -> None:
 
                                                         # 文字サイズ（大/中/小）
                                                         def _on_catch_size(e):
-                                                            step2["catch_size"] = e.value or "中"
+                                                            value = e.value or "中"
+                                                            if step2.get("catch_size") == value:
+                                                                return
+                                                            step2["catch_size"] = value
                                                             update_and_refresh()
                                                         ui.label("キャッチ文字サイズ").classes("cvhb-muted")
                                                         ui.radio(["大", "中", "小"], value=step2.get("catch_size", "中"), on_change=_on_catch_size).props(
@@ -25419,7 +26412,10 @@ def render_main(u: User) -> None:
                                                         bind_block_input("hero", "サブキャッチ（任意）", "sub_catch")
 
                                                         def _on_sub_catch_size(e):
-                                                            step2["sub_catch_size"] = e.value or "中"
+                                                            value = e.value or "中"
+                                                            if step2.get("sub_catch_size") == value:
+                                                                return
+                                                            step2["sub_catch_size"] = value
                                                             update_and_refresh()
                                                         ui.label("サブキャッチ文字サイズ").classes("cvhb-muted")
                                                         ui.radio(["大", "中", "小"], value=step2.get("sub_catch_size", "中"), on_change=_on_sub_catch_size).props(
@@ -25465,6 +26461,8 @@ def render_main(u: User) -> None:
                                                             cc = hero["hero_slide_choices"]
                                                             uu = hero["hero_image_urls"]
                                                             nn = hero["hero_upload_names"]
+                                                            if cc[i] == val:
+                                                                return
                                                             cc[i] = val
                                                             if val != "オリジナル":
                                                                 uu[i] = HERO_IMAGE_PRESET_URLS.get(val, HERO_IMAGE_PRESET_URLS.get(DEFAULT_CHOICES[i], HERO_IMAGE_DEFAULT))
@@ -25585,7 +26583,7 @@ def render_main(u: User) -> None:
                                                         def ph_image_editor():
                                                             cur = str(ph.get("image_url") or "").strip()
                                                             name = str(ph.get("image_upload_name") or "").strip()
-                                                            show_url = cur or "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?auto=format&fit=crop&w=1280&h=720&q=60"
+                                                            show_url = cur or PREVIEW_ABOUT_IMAGE_DEFAULT
                                                             with ui.row().classes("items-center q-gutter-sm"):
                                                                 # 現在反映されている画像（サムネ）
                                                                 try:
@@ -25610,9 +26608,12 @@ def render_main(u: User) -> None:
                                                         ph["points"] = points
 
                                                         def _set_point(i: int, v: str):
+                                                            v = v or ""
                                                             ps = _safe_list(ph.get("points"))
                                                             while len(ps) < 3:
                                                                 ps.append("")
+                                                            if ps[i] == v:
+                                                                return
                                                             ps[i] = v
                                                             ph["points"] = ps[:3]
                                                             update_and_refresh()
@@ -25713,7 +26714,7 @@ def render_main(u: User) -> None:
                                                         def svc_image_editor():
                                                             cur = str(svc.get("image_url") or "").strip()
                                                             name = str(svc.get("image_upload_name") or "").strip()
-                                                            show_url = cur or "https://images.unsplash.com/photo-1524758631624-e2822e304c36?auto=format&fit=crop&w=1280&h=720&q=60"
+                                                            show_url = cur or PREVIEW_SERVICES_IMAGE_DEFAULT
                                                             with ui.row().classes("items-center q-gutter-sm"):
                                                                 # 現在反映されている画像（サムネ）
                                                                 try:
@@ -25780,88 +26781,40 @@ def render_main(u: User) -> None:
                                                         ui.label("お知らせ").classes("text-subtitle1 q-mb-sm")
                                                         ui.label("最大3件がスマホ側に表示されます（PCは4件まで表示）。").classes("cvhb-muted q-mb-sm")
 
-                                                        @ui.refreshable
-                                                        def news_editor():
-                                                            items = blocks.setdefault("news", {}).setdefault("items", [])
-                                                            if not isinstance(items, list):
-                                                                items = []
-                                                                blocks["news"]["items"] = items
-
-                                                            def add_item():
-                                                                items.insert(0, {"date": datetime.now(JST).strftime("%Y-%m-%d"), "category": "お知らせ", "title": "", "body": ""})
-                                                                update_and_refresh(structure_changed=True)
-                                                                news_editor.refresh()
-
-                                                            def delete_item(i: int):
-                                                                try:
-                                                                    del items[i]
-                                                                except Exception:
-                                                                    pass
-                                                                update_and_refresh(structure_changed=True)
-                                                                news_editor.refresh()
-
-                                                            def set_field(i: int, key: str, val: str):
-                                                                if i < 0 or i >= len(items):
-                                                                    return
-                                                                items[i][key] = val
-                                                                update_and_refresh()
-
-                                                            ui.button("＋ 追加", on_click=add_item).props("color=primary outline").classes("q-mb-sm")
-                                                            if not items:
-                                                                ui.label("まだお知らせがありません").classes("cvhb-muted")
-                                                            for i, it in enumerate(items):
-                                                                with ui.card().classes("w-full q-pa-md q-mb-sm rounded-borders cvhb-entry-card").props("flat bordered"):
-                                                                    with ui.row().classes("items-center justify-between"):
-                                                                        ui.label(f"お知らせ #{i+1}").classes("text-body1")
-                                                                        ui.button("削除", on_click=lambda idx=i: delete_item(idx)).props("flat color=negative")
-                                                                    ui.input("日付", value=it.get("date",""), on_change=lambda e, idx=i: set_field(idx, "date", e.value or "")).props("outlined type=date").classes("w-full q-mb-sm")
-                                                                    ui.input("カテゴリ", value=it.get("category",""), on_change=lambda e, idx=i: set_field(idx, "category", e.value or "")).props("outlined").classes("w-full q-mb-sm")
-                                                                    ui.input("タイトル", value=it.get("title",""), on_change=lambda e, idx=i: set_field(idx, "title", e.value or "")).props("outlined").classes("w-full q-mb-sm")
-                                                                    ui.input("本文", value=it.get("body",""), on_change=lambda e, idx=i: set_field(idx, "body", e.value or "")).props("outlined type=textarea autogrow").classes("w-full")
-                                                        news_editor()
-                                                        # refresh hook not needed; update_and_refresh will refresh preview
+                                                        def _news_fields(it: dict, set_field) -> None:
+                                                            std_input("日付", it["date"], partial(_forward_input_value, set_field, it, "date"), input_type="date")
+                                                            std_input("カテゴリ", it["category"], partial(_forward_input_value, set_field, it, "category"))
+                                                            std_input("タイトル", it["title"], partial(_forward_input_value, set_field, it, "title"))
+                                                            std_input("本文", it["body"], partial(_forward_input_value, set_field, it, "body"), textarea=True, classes=("w-full",))
+
+                                                        # normalize_project 済みなので items は dict の list（各キーあり）
+                                                        entry_card_list(
+                                                            blocks["news"]["items"],
+                                                            block_key="news",
+                                                            title_prefix="お知らせ",
+                                                            empty_text="まだお知らせがありません",
+                                                            new_item=lambda: {"date": today_jst(), "category": "お知らせ", "title": "", "body": ""},
+                                                            insert_top=True,
+                                                            render_fields=_news_fields,
+                                                        )
 
                                                     if current_block == "faq":
                                                         ui.label("FAQ").classes("text-subtitle1 q-mb-sm")
                                                         ui.label("Q&Aを編集できます。").classes("cvhb-muted q-mb-sm")
 
-                                                        @ui.refreshable
-                                                        def faq_editor():
-                                                            items = blocks.setdefault("faq", {}).setdefault("items", [])
-                                                            if not isinstance(items, list):
-                                                                items = []
-                                                                blocks["faq"]["items"] = items
-
-                                                            def add_item():
-                                                                items.append({"q": "", "a": ""})
-                                                                update_and_refresh(structure_changed=True)
-                                                                faq_editor.refresh()
-
-                                                            def delete_item(i: int):
-                                                                try:
-                                                                    del items[i]
-                                                                except Exception:
-                                                                    pass
-                                                                update_and_refresh(structure_changed=True)
-                                                                faq_editor.refresh()
-
-                                                            def set_field(i: int, key: str, val: str):
-                                                                if i < 0 or i >= len(items):
-                                                                    return
-                                                                items[i][key] = val
-                                                                update_and_refresh()
-
-                                                            ui.button("＋ 追加", on_click=add_item).props("color=primary outline").classes("q-mb-sm")
-                                                            if not items:
-                                                                ui.label("まだFAQがありません").classes("cvhb-muted")
-                                                            for i, it in enumerate(items):
-                                                                with ui.card().classes("w-full q-pa-md q-mb-sm rounded-borders cvhb-entry-card").props("flat bordered"):
-                                                                    with ui.row().classes("items-center justify-between"):
-                                                                        ui.label(f"FAQ #{i+1}").classes("text-body1")
-                                                                        ui.button("削除", on_click=lambda idx=i: delete_item(idx)).props("flat color=negative")
-                                                                    ui.input("質問（Q）", value=it.get("q",""), on_change=lambda e, idx=i: set_field(idx, "q", e.value or "")).props("outlined").classes("w-full q-mb-sm")
-                                                                    ui.input("回答（A）", value=it.get("a",""), on_change=lambda e, idx=i: set_field(idx, "a", e.value or "")).props("outlined type=textarea autogrow").classes("w-full")
-                                                        faq_editor()
+                                                        def _faq_fields(it: dict, set_field) -> None:
+                                                            std_input("質問（Q）", it["q"], partial(_forward_input_value, set_field, it, "q"))
+                                                            std_input("回答（A）", it["a"], partial(_forward_input_value, set_field, it, "a"), textarea=True, classes=("w-full",))
+
+                                                        entry_card_list(
+                                                            blocks["faq"]["items"],
+                                                            block_key="faq",
+                                                            title_prefix="FAQ",
+                                                            empty_text="まだFAQがありません",
+                                                            new_item=lambda: {"q": "", "a": ""},
+                                                            insert_top=False,
+                                                            render_fields=_faq_fields,
+                                                        )
 
                                                     if current_block == "access_contact":
                                                         ui.label("アクセス / お問い合わせ").classes("text-subtitle1 q-mb-sm")
@@ -25952,16 +26905,36 @@ def render_main(u: User) -> None:
                                                                                                                     def _on_ext(e):
                                                                                                                         update_block("contact", "external_form_url", e.value or "")
 
-                                                                                                                    ui.input("外部フォームURL（必須）", value=_ext, on_change=_on_ext).props("outlined").classes(
-                                                                                                                        "w-full q-mb-sm"
-                                                                                                                    )
+                                                                                                                    std_input("外部フォームURL（必須）", _ext, _on_ext)
                                                                                                                     ui.label("例：Googleフォーム等のURL").classes("text-caption text-grey q-mb-sm")
 
                                                                                                                 bind_block_input("contact", "受付時間（任意）", "hours")
                                                                                                                 bind_block_input("contact", "メッセージ（任意）", "message", textarea=True)
 
-                                                block_content_ref["refresh"] = block_content_panel.refresh
-                                                block_content_panel()
+                                                # 開いたブロックだけを初回に作り、2回目以降は作成済みパネルの表示切替で済ませる
+                                                block_panel_host = ui.column().classes("w-full")
+                                                built_block_panels: dict[str, ui.column] = {}
+
+                                                def show_block_panel(block_key: str, *, rebuild: bool = False) -> None:
+                                                    if rebuild:
+                                                        old_panel = built_block_panels.pop(block_key, None)
+                                                        if old_panel is not None:
+                                                            try:
+                                                                old_panel.delete()
+                                                            except Exception:
+                                                                pass
+                                                    for k, panel in built_block_panels.items():
+                                                        panel.set_visibility(k == block_key)
+                                                    if block_key in built_block_panels:
+                                                        return
+                                                    with block_panel_host:
+                                                        with ui.column().classes("w-full") as panel:
+                                                            block_content_panel(block_key)
+                                                    built_block_panels[block_key] = panel
+
+                                                block_content_ref["show"] = show_block_panel
+                                                block_content_ref["refresh"] = lambda: show_block_panel(_ui_get(UI_BLOCK_KEY, "hero", allowed_blocks), rebuild=True)
+                                                show_block_panel(block_initial)
 
                                         editor_ref["refresh"] = block_editor_panel.refresh
                                         try:
@@ -26754,20 +27727,20 @@ def render_main(u: User) -> None:
                                                 def _set_publish(key: str, value):
                                                     publish[key] = value
 
-                                                ui.input("SFTPホスト", value=str(publish.get("sftp_host") or ""), on_change=lambda e: _set_publish("sftp_host", e.value or "")).props("outlined dense").classes("w-full q-mt-sm")
-                                                ui.input("ポート（通常22）", value=str(publish.get("sftp_port") or 22), on_change=lambda e: _set_publish("sftp_port", e.value or "22")).props("outlined dense").classes("w-full q-mt-sm")
-                                                ui.input("SFTPユーザー名", value=str(publish.get("sftp_user") or ""), on_change=lambda e: _set_publish("sftp_user", e.value or "")).props("outlined dense").classes("w-full q-mt-sm")
-                                                ui.input("公開ディレクトリ（例: /public_html）", value=str(publish.get("sftp_dir") or ""), on_change=lambda e: _set_publish("sftp_dir", e.value or "")).props("outlined dense").classes("w-full q-mt-sm")
-                                                ui.input("メモ（任意）", value=str(publish.get("sftp_note") or ""), on_change=lambda e: _set_publish("sftp_note", e.value or "")).props("outlined dense").classes("w-full q-mt-sm")
-                                                ui.input("本番公開URL（例: https://corevista-japan.com/）", value=str(publish.get("public_site_url") or ""), on_change=lambda e: _set_publish("public_site_url", e.value or "")).props("outlined dense").classes("w-full q-mt-sm")
+                                                std_input("SFTPホスト", str(publish.get("sftp_host") or ""), lambda e: _set_publish("sftp_host", e.value or ""), dense=True, classes=_STD_INPUT_CLASSES_MT)
+                                                std_input("ポート（通常22）", str(publish.get("sftp_port") or 22), lambda e: _set_publish("sftp_port", e.value or "22"), dense=True, classes=_STD_INPUT_CLASSES_MT)
+                                                std_input("SFTPユーザー名", str(publish.get("sftp_user") or ""), lambda e: _set_publish("sftp_user", e.value or ""), dense=True, classes=_STD_INPUT_CLASSES_MT)
+                                                std_input("公開ディレクトリ（例: /public_html）", str(publish.get("sftp_dir") or ""), lambda e: _set_publish("sftp_dir", e.value or ""), dense=True, classes=_STD_INPUT_CLASSES_MT)
+                                                std_input("メモ（任意）", str(publish.get("sftp_note") or ""), lambda e: _set_publish("sftp_note", e.value or ""), dense=True, classes=_STD_INPUT_CLASSES_MT)
+                                                std_input("本番公開URL（例: https://corevista-japan.com/）", str(publish.get("public_site_url") or ""), lambda e: _set_publish("public_site_url", e.value or ""), dense=True, classes=_STD_INPUT_CLASSES_MT)
                                                 ui.checkbox("公開後に Google Indexing API へ通知する", value=_as_bool(publish.get("google_indexing_enabled"), default=True), on_change=lambda e: _set_publish("google_indexing_enabled", bool(e.value))).classes("q-mt-sm")
-                                                ui.input("Google service account JSON パス（任意）", value=str(publish.get("google_service_account_file") or ""), on_change=lambda e: _set_publish("google_service_account_file", e.value or "")).props("outlined dense").classes("w-full q-mt-sm")
+                                                std_input("Google service account JSON パス（任意）", str(publish.get("google_service_account_file") or ""), lambda e: _set_publish("google_service_account_file", e.value or ""), dense=True, classes=_STD_INPUT_CLASSES_MT)
                                                 ui.label(f"空欄時は {CVHB_GOOGLE_SERVICE_ACCOUNT_FILE_ENV} / GOOGLE_APPLICATION_CREDENTIALS / codex-secrets 内の既定ファイル名を順に参照します。").classes("cvhb-muted text-caption q-mt-xs")
 
                                                 def _on_pw(e):
                                                     publish_ui_state["password"] = e.value or ""
 
-                                                ui.input("SFTPパスワード（保存されません）", value=publish_ui_state.get("password", ""), on_change=_on_pw).props("outlined dense type=password").classes("w-full q-mt-sm")
+                                                std_input("SFTPパスワード（保存されません）", publish_ui_state.get("password", ""), _on_pw, dense=True, input_type="password", classes=_STD_INPUT_CLASSES_MT)
                                                 pub_confirm = ui.checkbox("公開する（上書きアップロード）").classes("q-mt-sm")
                                                 cleanup_confirm = ui.checkbox("危険：リモートの不要ファイルも削除する（通常OFF）").classes("q-mt-xs")
                                                 ui.label("※ ONにすると、公開ディレクトリ内の古いファイルが消える可能性があります。").classes("text-negative text-caption q-mt-xs")
@@ -27104,7 +28077,7 @@ def render_main(u: User) -> None:
                             ui.label("スマホ / PC 切替").classes("cvhb-muted")
 
                                                 # プレビュー表示モード（mobile / pc）
-                        preview_mode = {"value": _ui_get(UI_PV_MODE_KEY, "mobile", ["mobile", "pc"])}
+                        preview_mode = {"value": _ui_get(UI_PV_MODE_KEY, "mobile", PREVIEW_MODES)}
 
                         @ui.refreshable
                         def pv_mode_selector():
@@ -27120,7 +28093,7 @@ def render_main(u: User) -> None:
                                 preview_mode["value"] = m
 
                                 capture_builder_view_state(include_focus=False)
-                                _ui_set(UI_PV_MODE_KEY, m, ["mobile", "pc"])
+                                _ui_set(UI_PV_MODE_KEY, m, PREVIEW_MODES)
                                 try:
                                     pv_mode_selector.refresh()
                                 except Exception:
@@ -27143,22 +28116,14 @@ def render_main(u: User) -> None:
                         preview_lazy_state = {"mounted": False}
 
                         def render_preview_skeleton(mode: str) -> None:
-                            with ui.element("div").classes(f"cvhb-preview-skeleton cvhb-preview-skeleton-{mode}").style("display:grid;gap:14px;padding:18px;"):
-                                ui.element("div").style(
-                                    "height:42px;border-radius:14px;border:1px solid rgba(15,23,42,0.08);"
-                                    "background:linear-gradient(180deg, rgba(248,250,252,0.96), rgba(241,245,249,0.92));"
-                                )
-                                ui.element("div").style(
-                                    "height:280px;border-radius:22px;border:1px solid rgba(15,23,42,0.08);"
-                                    "background:linear-gradient(180deg, rgba(255,255,255,0.98), rgba(241,245,249,0.92));"
-                                )
-                                ui.element("div").style(
-                                    "height:132px;border-radius:18px;border:1px solid rgba(15,23,42,0.08);"
-                                    "background:linear-gradient(180deg, rgba(248,250,252,0.96), rgba(241,245,249,0.92));"
-                                )
+                            with ui.element("div").classes(f"cvhb-preview-skeleton cvhb-preview-skeleton-{mode}"):
+                                for part in ("nav", "hero", "body"):
+                                    ui.element("div").classes(f"cvhb-preview-skeleton-block cvhb-preview-skeleton-{part}")
 
                         @ui.refreshable
                         def preview_panel():
+                            preview_render_state["key"] = ""
+                            preview_ref["sections"] = {}
                             mode = str(preview_mode.get("value") or "mobile")
                             if mode not in ("mobile", "pc"):
                                 mode = "mobile"
@@ -27172,19 +28137,13 @@ def render_main(u: User) -> None:
                             # - PC: 1080px を基準に、入る範囲だけ縮小する
                             min_scale = 0.01
                             max_scale = 1.00
-                            radius = 22 if mode == "mobile" else 14
 
-                            frame_style = (
-                                f"{'width: min(100%, 1080px);' if mode == 'pc' else 'width: 100%;'} min-height: 0; height: auto; overflow: hidden; border-radius: {radius}px; margin: 0 auto;"
-                            )
+                            # 枠の幅・角丸・背景の敷き方はグローバルCSSのクラス側。インラインは案件のテーマ変数だけ。
                             fit_props = 'id="pv-fit" data-cvhb-fit-auto-height="1"'
                             preview_step1 = ((p.get("data") or {}).get("step1") if isinstance(p, dict) and isinstance(p.get("data"), dict) else (p.get("step1") if isinstance(p, dict) else {})) or {}
-                            fit_style = (
-                                "width: 100%; min-height: 0; height: auto; display: block; overflow-x: hidden; overflow-y: hidden; position: relative; "
-                                + _preview_stage_shell_style(preview_step1)
-                            )
-                            with ui.card().classes(f"cvhb-preview-card cvhb-preview-card-{mode} cvhb-surface-card").style(frame_style).props('flat bordered id="pv-card"'):
-                                with ui.element("div").classes(f"cvhb-preview-stage cvhb-preview-stage-{mode}").props(fit_props).style(fit_style):
+                            fit_style = _preview_stage_shell_style(preview_step1)
+                            with ui.card().classes(f"cvhb-preview-card cvhb-preview-card-{mode} cvhb-surface-card").props('flat bordered id="pv-card"'):
+                                with ui.element("div").classes(f"cvhb-preview-stage cvhb-preview-stage-{mode} cvhb-preview-stage-themed").props(fit_props).style(fit_style):
                                     if not p:
                                         ui.label(f"案件を選ぶと {BUILDER_NAME} のプレビューが出ます").classes("cvhb-muted q-pa-md")
                                         return
@@ -27202,7 +28161,7 @@ def render_main(u: User) -> None:
                                         if _current_step_value() == "s4":
                                             render_recruitment_page_preview(p, mode=mode, root_id="pv-root", in_builder=True)
                                         else:
-                                            render_preview(p, mode=mode, root_id="pv-root", in_builder=True)
+                                            render_preview(p, mode=mode, root_id="pv-root", in_builder=True, section_refs=preview_ref["sections"])
 
                                         # fit-to-width (design: 860px / 1080px)
                                         try:
@@ -28396,7 +29355,7 @@ def _pack_coerce_seed(values: dict) -> dict:
     seed = {key: _pack_text(values.get(key)) for key in PACK_FIELD_BY_KEY.keys()}
     seed["project_name"] = _pack_safe_project_name(seed.get("project_name"), seed.get("company_name"))
     industry = _pack_text(seed.get("industry")) or "会社サイト（企業）"
-    if industry not in INDUSTRY_OPTIONS:
+    if industry not in INDUSTRY_OPTIONS_SET:
         industry = "会社サイト（企業）"
     seed["industry"] = industry
     if industry == "福祉事業所":
@@ -28644,7 +29603,7 @@ def build_project_from_pageflow_pack_zip(zip_bytes: bytes, actor: Optional[User]
         body = _pack_text(seed.get(f"news_body_{idx}"))
         if title or body:
             news_items.append({
-                "date": datetime.now(JST).strftime("%Y-%m-%d"),
+                "date": today_jst(),
                 "category": "お知らせ",
                 "title": title,
                 "body": body,
@@ -31692,7 +32651,7 @@ def render_pageflowai2_live_mvp(active_view: str = "home") -> None:
                             ui.label(PF2_JOB_STATE_LABELS.get(row_job.get("main_state"), "未開始")).classes(f"pf2-pill pf2-pill-{row_job.get('main_state', PF2_JOB_STATE_NOT_STARTED)}")
                             ui.label(str(len(row_job.get("public_check", {}).get("blocks", [])))).classes("pf2-job-meta")
                             ui.label("公開用ファイルに含めます").classes("pf2-job-meta")
-                            ui.button("編集中" if is_active else "開く", on_click=lambda pid=pid: _select_project(pid)).props(("color=primary " if is_active else "outline ") + "no-caps dense")
+                            ui.button("編集中" if is_active else "開く", on_click=partial(_select_project, pid)).props(("color=primary " if is_active else "outline ") + "no-caps dense")
 
         with ui.element("section").props("id=pf2-company-basic").classes("pf2-section pf2-panel pf2-route-section pf2-view-home pf2-view-jobs"):
             _pf2_section_title("基本情報", "会社情報", "会社名・連絡先・公開ページURLに使う基本情報です。")
@@ -31882,7 +32841,7 @@ def render_pageflowai2_live_mvp(active_view: str = "home") -> None:
                 with ui.row().classes("q-gutter-sm q-mt-md"):
                     ui.button("会社ページ用の公開ファイルを作成", icon="archive", on_click=_generate_homepage_pack).props("color=positive unelevated no-caps")
                     if state.get("homepage_download_url"):
-                        ui.button("ファイルをダウンロード", icon="download", on_click=lambda url=state["homepage_download_url"]: ui.run_javascript(f"window.open('{url}', '_blank')")).props("outline no-caps")
+                        ui.button("ファイルをダウンロード", icon="download", on_click=lambda url=state["homepage_download_url"]: ui.run_javascript(f"window.open({json.dumps(url)}, '_blank')")).props("outline no-caps")
                 if state.get("homepage_export_path"):
                     ui.label(f"保存先: {state.get('homepage_export_path')}").classes("pf2-job-meta q-mt-sm")
                 if state.get("homepage_download_url"):
@@ -32111,7 +33070,7 @@ def render_pageflowai2_live_mvp(active_view: str = "home") -> None:
                 with ui.element("div").classes("pf2-gate q-mt-md"):
                     ui.label("公開用ファイルを作成しました。")
                     ui.label(f"保存先: {state.get('export_path')}")
-                    ui.button("ファイルをダウンロード", icon="download", on_click=lambda url=state["download_url"]: ui.run_javascript(f"window.open('{url}', '_blank')")).props("color=positive unelevated no-caps")
+                    ui.button("ファイルをダウンロード", icon="download", on_click=lambda url=state["download_url"]: ui.run_javascript(f"window.open({json.dumps(url)}, '_blank')")).props("color=positive unelevated no-caps")
                     ui.label("外部求人サービス等での掲載・審査・検索結果表示は各媒体側の判断です。")
                     with ui.element("div").classes("pf2-guide-list q-mt-md"):
                         for idx, item in enumerate(PF2_OUTPUT_STEPS, start=1):
@@ -32952,6 +33911,7 @@ def legacy_projects_page():
                                 ui.label("管理者から担当案件が割り当てられると、ここに表示されます。")                                    .classes("cvhb-muted q-mt-xs")
                         return
 
+                    can_admin = is_admin(u)
                     for item in items:
                         pid = str(item.get("project_id") or "")
                         pname = str(item.get("project_name") or pid)
@@ -32980,13 +33940,12 @@ def legacy_projects_page():
                             ui.label(f"ID: {pid}").classes("cvhb-project-meta q-mt-xs")
 
                             with ui.row().classes("q-gutter-sm q-mt-md"):
-                                ui.button("開く", on_click=lambda pid=pid, pname=pname: open_project(pid, pname)).props("color=primary unelevated")
+                                ui.button("開く", on_click=partial(open_project, pid, pname)).props("color=primary unelevated")
                                 if project_settings_role:
-                                    ui.button("案件設定", on_click=lambda item=item: _open_settings(item)).props("outline no-caps")
-                                if is_admin(u):
-                                    ui.button("登録画像一覧", on_click=lambda pid=pid, pname=pname: _open_images_dialog(pid, pname)).props("outline")
-                                if is_admin(u):
-                                    ui.button("削除", on_click=lambda item=item: _open_delete(item)).props("color=negative outline")
+                                    ui.button("案件設定", on_click=partial(_open_settings, item)).props("outline no-caps")
+                                if can_admin:
+                                    ui.button("登録画像一覧", on_click=partial(_open_images_dialog, pid, pname)).props("outline")
+                                    ui.button("削除", on_click=partial(_open_delete, item)).props("color=negative outline")
 
                 list_refresh()
             except Exception as e:
@@ -32996,8 +33955,73 @@ def legacy_projects_page():
 
     page_refresh()
 
+AUDIT_PAGE_COLUMNS_SQL = """
+    to_char(created_at AT TIME ZONE 'Asia/Tokyo', 'YYYY-MM-DD HH24:MI') AS "日時(JST)",
+    COALESCE(company_name, '') AS "会社",
+    COALESCE(username, '') AS "ユーザー",
+    COALESCE(role, '') AS "権限",
+    COALESCE(project_id, '') AS "案件ID",
+    action AS "操作",
+    details AS "詳細"
+"""
+# ページ送りは OFFSET ではなく (created_at, id) のキーセットで「前ページの最後の行より古いもの」を取る。
+# 書き込みは1トランザクションにまとめるので created_at（NOW()）が同じ行が並ぶ。id で順序を決めて取りこぼさない。
+_AUDIT_PAGE_SELECT_HEAD = f"SELECT {AUDIT_PAGE_COLUMNS_SQL}, id AS _id, created_at AS _created_at FROM audit_logs"
+_AUDIT_PAGE_ORDER_SQL = " ORDER BY created_at DESC, id DESC LIMIT %s"
+AUDIT_PAGE_SELECT_SQL = _AUDIT_PAGE_SELECT_HEAD + _AUDIT_PAGE_ORDER_SQL
+AUDIT_PAGE_SELECT_BEFORE_SQL = _AUDIT_PAGE_SELECT_HEAD + " WHERE (created_at, id) < (%s, %s)" + _AUDIT_PAGE_ORDER_SQL
+# idx_audit_logs_action_created_at_id / idx_audit_logs_created_at_id で範囲スキャンになる
+AUDIT_PAGE_SELECT_BY_ACTION_SQL = _AUDIT_PAGE_SELECT_HEAD + " WHERE action = %s" + _AUDIT_PAGE_ORDER_SQL
+AUDIT_PAGE_SELECT_BY_ACTION_BEFORE_SQL = _AUDIT_PAGE_SELECT_HEAD + " WHERE action = %s AND (created_at, id) < (%s, %s)" + _AUDIT_PAGE_ORDER_SQL
+# 列名は AUDIT_PAGE_COLUMNS_SQL の別名と同じ（行の整形は DB 側で済んでいるので Python では触らない）
+AUDIT_PAGE_TABLE_COLUMNS: tuple[dict, ...] = tuple(
+    {"name": name, "label": name, "field": name}
+    for name in ("日時(JST)", "会社", "ユーザー", "権限", "案件ID", "操作", "詳細")
+)
+AUDIT_PAGE_LIMIT_DEFAULT = 50
+AUDIT_PAGE_LIMIT_MAX = 1000
+AUDIT_PAGE_ACTION_MAX_LEN = 128
+
+
+def clamp_audit_page_limit(value) -> int:
+    """表示件数を 1〜AUDIT_PAGE_LIMIT_MAX に収める（画面の max は送信側で外せるのでサーバーでも切る）。"""
+    if value is None or value == "":
+        return AUDIT_PAGE_LIMIT_DEFAULT
+    try:
+        n = int(value)
+    except (TypeError, ValueError, OverflowError):
+        n = AUDIT_PAGE_LIMIT_DEFAULT
+    return max(1, min(n, AUDIT_PAGE_LIMIT_MAX))
+
+
+def fetch_audit_page(action: str, limit: int, before: Optional[tuple] = None) -> tuple[list[dict], Optional[tuple]]:
+    """操作ログを新しい順に limit 件取る。戻り値は (表示用の行, 次のページのカーソル or None)。
+
+    before は前ページ最後の行の (created_at, id)。1件多く取って、次のページがあるかを COUNT なしで判定する。
+    """
+    if action:
+        if before:
+            rows = db_fetchall(AUDIT_PAGE_SELECT_BY_ACTION_BEFORE_SQL, (action, before[0], before[1], limit + 1))
+        else:
+            rows = db_fetchall(AUDIT_PAGE_SELECT_BY_ACTION_SQL, (action, limit + 1))
+    elif before:
+        rows = db_fetchall(AUDIT_PAGE_SELECT_BEFORE_SQL, (before[0], before[1], limit + 1))
+    else:
+        rows = db_fetchall(AUDIT_PAGE_SELECT_SQL, (limit + 1,))
+    rows = list(rows or [])
+    has_next = len(rows) > limit
+    del rows[limit:]
+    next_cursor = None
+    for row in rows:
+        # ui.table に datetime を渡さない（カーソル用に最後の行の値だけ手元に残す）
+        created_at = row.pop("_created_at", None)
+        if has_next:
+            next_cursor = (created_at, row.get("_id"))
+    return rows, next_cursor
+
+
 @ui.page("/audit", response_timeout=60.0, reconnect_timeout=45.0)
-def audit_page():
+async def audit_page():
     inject_global_styles()
     cleanup_user_storage()
     sync_builder_shell(False)
@@ -33028,34 +34052,50 @@ def audit_page():
 
     with ui.element("div").classes("cvhb-container"):
         ui.label("操作ログ").classes("text-h5 q-mb-md")
-        rows_raw = db_fetchall(
-            "SELECT created_at, username, role, company_name, project_id, action, details FROM audit_logs ORDER BY created_at DESC LIMIT 300",
-            None,
-        )
-        rows = []
-        for row in rows_raw:
-            rows.append({
-                "日時(JST)": fmt_jst(row.get("created_at")),
-                "会社": row.get("company_name") or "",
-                "ユーザー": row.get("username") or "",
-                "権限": row.get("role") or "",
-                "案件ID": row.get("project_id") or "",
-                "操作": row.get("action") or "",
-                "詳細": row.get("details") or "",
-            })
-        ui.table(
-            columns=[
-                {"name": "日時(JST)", "label": "日時(JST)", "field": "日時(JST)"},
-                {"name": "会社", "label": "会社", "field": "会社"},
-                {"name": "ユーザー", "label": "ユーザー", "field": "ユーザー"},
-                {"name": "権限", "label": "権限", "field": "権限"},
-                {"name": "案件ID", "label": "案件ID", "field": "案件ID"},
-                {"name": "操作", "label": "操作", "field": "操作"},
-                {"name": "詳細", "label": "詳細", "field": "詳細"},
-            ],
-            rows=rows,
-            row_key="日時(JST)",
-        ).classes("w-full")
+        with ui.row().classes("items-center q-gutter-sm q-mb-sm"):
+            action_input = ui.input("操作で絞り込み（例：login）").props(f"outlined dense clearable maxlength={AUDIT_PAGE_ACTION_MAX_LEN}")
+            limit_input = ui.number("1ページの件数", value=AUDIT_PAGE_LIMIT_DEFAULT, min=1, max=AUDIT_PAGE_LIMIT_MAX, step=50, precision=0).props("outlined dense").classes("w-32")
+            ui.button("絞り込む", on_click=lambda: _go_first()).props("outline dense no-caps")
+
+        # cursors[n] は n ページ目の取得開始位置（0ページ目は None = 最新から）
+        pager = {"cursors": [None], "next": None}
+
+        def _go_first() -> None:
+            pager["cursors"] = [None]
+            table_refresh.refresh()
+
+        def _go_older() -> None:
+            if pager["next"] is None:
+                return
+            pager["cursors"].append(pager["next"])
+            table_refresh.refresh()
+
+        def _go_newer() -> None:
+            if len(pager["cursors"]) <= 1:
+                return
+            pager["cursors"].pop()
+            table_refresh.refresh()
+
+        @ui.refreshable
+        async def table_refresh():
+            action = str(action_input.value or "").strip()[:AUDIT_PAGE_ACTION_MAX_LEN]
+            limit = clamp_audit_page_limit(limit_input.value)
+            # 表示用の整形（JST変換・空欄化・列名）はDB側で済ませ、そのまま ui.table に渡す
+            # DB待ちの間もイベントループを止めない（他の利用者の画面が固まらないように）
+            rows, pager["next"] = await asyncio.to_thread(fetch_audit_page, action, limit, pager["cursors"][-1])
+            page_no = len(pager["cursors"])
+            with ui.row().classes("items-center q-gutter-sm q-mb-sm"):
+                ui.button("新しい方へ", icon="chevron_left", on_click=_go_newer).props("flat dense no-caps").set_enabled(page_no > 1)
+                ui.label(f"{page_no}ページ目").classes("cvhb-muted")
+                ui.button("古い方へ", icon="chevron_right", on_click=_go_older).props("flat dense no-caps").set_enabled(pager["next"] is not None)
+            ui.table(
+                columns=list(AUDIT_PAGE_TABLE_COLUMNS),
+                rows=rows,
+                row_key="_id",
+            ).classes("w-full")
+
+        action_input.on("keydown.enter", lambda e: _go_first())
+        await table_refresh()
 
 def sync_builder_shell(enabled: bool) -> None:
     """/ ページのPCビルダーだけ outer scroll を止める。"""
@@ -33131,7 +34171,7 @@ async def index():
                     return
 
                 # 本番：初回のみ admin を作らせる
-                if APP_ENV != "stg" and count_users() == 0:
+                if APP_ENV != "stg" and not any_users_exist():
                     render_first_admin_setup(root_refresh)
                     return
 
@@ -33205,7 +34245,7 @@ async def index():
                                         + "border:1px solid rgba(0,0,0,0.10);"
                                         + _preview_stage_shell_style(preview_step1)
                                     )
-                                    with ui.element("div").classes(f"cvhb-preview-stage cvhb-preview-stage-{mode}").props(fit_props).style(fit_style):
+                                    with ui.element("div").classes(f"cvhb-preview-stage cvhb-preview-stage-{mode} cvhb-preview-stage-themed").props(fit_props).style(fit_style):
                                         try:
                                             render_preview(p_fallback, mode=mode, root_id="pv-root", in_builder=True)
                                         except Exception as e3:
@@ -33811,40 +34851,121 @@ def _extract_project_id_from_details(details: str) -> str:
     return ""
 
 
-def log_action(user: Optional[User], action: str, details: str = "{}") -> None:
+AUDIT_LOG_INSERT_SQL = """
+    INSERT INTO audit_logs (user_id, username, role, action, details, company_id, company_name, project_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _audit_log_row(user: Optional[User], action: str, details: str) -> tuple:
     project_id = _extract_project_id_from_details(details)
     if user:
-        db_execute(
-            """
-            INSERT INTO audit_logs (user_id, username, role, action, details, company_id, company_name, project_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                user.id,
-                user.username,
-                user.role,
-                action,
-                details,
-                _normalize_int_optional(getattr(user, "company_id", None)),
-                str(getattr(user, "company_name", "") or ""),
-                project_id or None,
-            ),
-        )
-    else:
-        db_execute(
-            """
-            INSERT INTO audit_logs (user_id, username, role, action, details, company_id, company_name, project_id)
-            VALUES (NULL, NULL, NULL, %s, %s, NULL, NULL, %s)
-            """,
-            (action, details, project_id or None),
+        return (
+            user.id,
+            user.username,
+            user.role,
+            action,
+            details,
+            _normalize_int_optional(getattr(user, "company_id", None)),
+            str(getattr(user, "company_name", "") or ""),
+            project_id or None,
         )
+    return (None, None, None, action, details, None, None, project_id or None)
+
+
+def _insert_audit_log_row(row: tuple) -> None:
+    db_execute(AUDIT_LOG_INSERT_SQL, row)
+
+
+def log_action(user: Optional[User], action: str, details: str = "{}") -> None:
+    _insert_audit_log_row(_audit_log_row(user, action, details))
+
+
+# 監査ログはバックグラウンドでまとめて INSERT する（ログイン等の処理にDB往復を挟まない）
+AUDIT_LOG_FLUSH_SEC = max(0.05, _env_float("CVHB_AUDIT_LOG_FLUSH_SEC", 0.25))
+AUDIT_LOG_BATCH_MAX = max(1, _env_int("CVHB_AUDIT_LOG_BATCH_MAX", 50))
+
+_AUDIT_LOG_QUEUE: "queue.Queue[tuple]" = queue.Queue()
+_AUDIT_LOG_WRITER: Optional[threading.Thread] = None
+_AUDIT_LOG_WRITER_LOCK = threading.Lock()
+
+
+def _write_audit_log_rows(rows: list[tuple]) -> None:
+    if not rows:
+        return
+    try:
+        with db_connect() as conn:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.executemany(AUDIT_LOG_INSERT_SQL, rows)
+        return
+    except Exception as e:
+        if len(rows) == 1:
+            print(f"[audit_log] failed action={rows[0][3]}: {sanitize_error_text(e)}", flush=True)
+            return
+        print(f"[audit_log] batch failed ({len(rows)} rows), retrying one by one: {sanitize_error_text(e)}", flush=True)
+    # まとめて書けなかったときは1件ずつ入れ直す（不正な1件や一瞬の切断で、同じバッチの他のログまで失わない）
+    for row in rows:
+        try:
+            _insert_audit_log_row(row)
+        except Exception as e:
+            print(f"[audit_log] failed action={row[3]}: {sanitize_error_text(e)}", flush=True)
+
+
+def _drain_audit_log_queue(first: Optional[tuple] = None, *, wait_sec: float = 0.0) -> list[tuple]:
+    rows: list[tuple] = [first] if first is not None else []
+    deadline = time.monotonic() + wait_sec
+    while len(rows) < AUDIT_LOG_BATCH_MAX:
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining > 0:
+                rows.append(_AUDIT_LOG_QUEUE.get(timeout=remaining))
+            else:
+                rows.append(_AUDIT_LOG_QUEUE.get_nowait())
+        except queue.Empty:
+            break
+    return rows
+
+
+def _audit_log_writer_loop() -> None:
+    while True:
+        first = _AUDIT_LOG_QUEUE.get()
+        _write_audit_log_rows(_drain_audit_log_queue(first, wait_sec=AUDIT_LOG_FLUSH_SEC))
+
+
+def flush_audit_log_queue() -> None:
+    """溜まっている監査ログを今すぐ書き込む（終了時用）。"""
+    while True:
+        rows = _drain_audit_log_queue()
+        if not rows:
+            return
+        _write_audit_log_rows(rows)
+
+
+def _ensure_audit_log_writer() -> None:
+    global _AUDIT_LOG_WRITER
+    if _AUDIT_LOG_WRITER is not None:
+        return
+    with _AUDIT_LOG_WRITER_LOCK:
+        if _AUDIT_LOG_WRITER is not None:
+            return
+        # 終了時の flush をプールの close より先に走らせる（atexit は後に登録したものから実行）
+        try:
+            _db_pool()
+        except Exception:
+            pass
+        atexit.register(flush_audit_log_queue)
+        t = threading.Thread(target=_audit_log_writer_loop, name="cvhb-audit-log", daemon=True)
+        t.start()
+        _AUDIT_LOG_WRITER = t
 
 
 def safe_log_action(user: Optional[User], action: str, details: str = "{}") -> None:
     if HELP_MODE:
         return
     try:
-        log_action(user, action, details)
+        _AUDIT_LOG_QUEUE.put_nowait(_audit_log_row(user, action, details))
+        _ensure_audit_log_writer()
     except Exception as e:
         print(f"[audit_log] failed: {sanitize_error_text(e)}")
 
@@ -33864,34 +34985,39 @@ def db_fetchall(sql: str, params: Optional[tuple] = None) -> list[dict]:
     return _db_fetchall_v173(sql, params)
 
 
+COMPANIES_SCHEMA_SQL: tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS companies (
+        id BIGSERIAL PRIMARY KEY,
+        company_code TEXT UNIQUE NOT NULL,
+        company_name TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'active',
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """,
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS company_id BIGINT NULL;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS display_name TEXT NOT NULL DEFAULT '';",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS must_change_password BOOLEAN NOT NULL DEFAULT FALSE;",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS created_by_user_id BIGINT NULL;",
+    "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS company_id BIGINT NULL;",
+    "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS company_name TEXT NULL;",
+    "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS project_id TEXT NULL;",
+    "CREATE INDEX IF NOT EXISTS idx_users_company_id ON users(company_id);",
+    "CREATE INDEX IF NOT EXISTS idx_audit_logs_company_id ON audit_logs(company_id, created_at DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_audit_logs_project_id ON audit_logs(project_id, created_at DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_audit_logs_action_created_at_id ON audit_logs(action, created_at DESC, id DESC);",
+    "DROP INDEX IF EXISTS idx_audit_logs_action_created_at;",
+    "UPDATE users SET display_name = username WHERE COALESCE(display_name, '') = '';",
+)
+
+
 def _ensure_companies_schema() -> None:
-    db_execute(
-        """
-        CREATE TABLE IF NOT EXISTS companies (
-            id BIGSERIAL PRIMARY KEY,
-            company_code TEXT UNIQUE NOT NULL,
-            company_name TEXT NOT NULL,
-            status TEXT NOT NULL DEFAULT 'active',
-            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-        """
-    )
-    db_execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS company_id BIGINT NULL;")
-    db_execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS display_name TEXT NOT NULL DEFAULT '';")
-    db_execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS must_change_password BOOLEAN NOT NULL DEFAULT FALSE;")
-    db_execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS created_by_user_id BIGINT NULL;")
-    db_execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS company_id BIGINT NULL;")
-    db_execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS company_name TEXT NULL;")
-    db_execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS project_id TEXT NULL;")
-    db_execute("CREATE INDEX IF NOT EXISTS idx_users_company_id ON users(company_id);")
-    db_execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_company_id ON audit_logs(company_id, created_at DESC);")
-    db_execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_project_id ON audit_logs(project_id, created_at DESC);")
-    db_execute("UPDATE users SET display_name = username WHERE COALESCE(display_name, '') = '';")
+    db_execute_script(COMPANIES_SCHEMA_SQL)
 
 
 def init_db_schema() -> None:
-    _init_db_schema_v173()
-    _ensure_companies_schema()
+    # 旧スキーマ＋マルチテナント追加分を1本の接続・1回の往復でまとめて流す
+    db_execute_script(DB_BASE_SCHEMA_SQL + COMPANIES_SCHEMA_SQL)
 
 
 def create_company(company_name: str, company_code: str = "", *, actor: Optional[User] = None) -> dict:
@@ -34128,7 +35254,7 @@ def set_logged_in(user_row: dict) -> None:
     app.storage.user["must_change_password"] = bool(user_row.get("must_change_password", False))
 
 
-def current_user() -> Optional[User]:
+def _current_user_lookup() -> Optional[User]:
     if HELP_MODE:
         try:
             app.storage.user["user_id"] = 0
@@ -34177,6 +35303,37 @@ def current_user() -> Optional[User]:
     return None
 
 
+# 同じクライアントで続けて current_user() を呼ぶとき（1ページの描画で header / 本体 / 権限確認が順に呼ぶ等）に、
+# DB のユーザー行を引き直さずに済ませる秒数。0 で毎回引く。
+CURRENT_USER_CACHE_SEC = max(0.0, _env_float("CVHB_CURRENT_USER_CACHE_SEC", 1.0))
+
+
+def current_user() -> Optional[User]:
+    """ログイン中のユーザー。結果はクライアント単位で CURRENT_USER_CACHE_SEC 秒だけ使い回す。
+
+    app.storage.client はページを開くたびに新しくなるので、別ページの描画には持ち越さない。
+    user_id が変わったとき（ログイン/ログアウト）は秒数に関係なく引き直す。
+    """
+    if HELP_MODE or CURRENT_USER_CACHE_SEC <= 0:
+        return _current_user_lookup()
+    try:
+        store = app.storage.client
+        uid = app.storage.user.get("user_id")
+    except Exception:
+        # ページの文脈が無い（スレッド内など）
+        return _current_user_lookup()
+    now = time.monotonic()
+    cached = store.get("cvhb_current_user")
+    if cached and cached[1] == uid and now - cached[0] < CURRENT_USER_CACHE_SEC:
+        return cached[2]
+    u = _current_user_lookup()
+    try:
+        store["cvhb_current_user"] = (now, app.storage.user.get("user_id"), u)
+    except Exception:
+        pass
+    return u
+
+
 def login_block_reason(row: Optional[dict]) -> str:
     if not isinstance(row, dict):
         return "ユーザー名またはパスワードが違います"
@@ -34223,16 +35380,23 @@ def password_change_needed(user: Optional[User]) -> bool:
     return needed
 
 
+# stg のテストユーザーは1プロセスで1回作れば十分（ログイン画面の描画ごとに INSERT しない）
+_STG_SEEDED = False
+
+
 def ensure_stg_test_users() -> tuple[bool, str]:
+    global _STG_SEEDED
+    if _STG_SEEDED:
+        return (True, "stg test users seeded (cached)")
     if APP_ENV != "stg":
         return (False, "not stg")
     pwd = os.getenv("STG_TEST_PASSWORD")
     if not pwd:
         return (False, "STG_TEST_PASSWORD が未設定です（stgのみ必要）")
     try:
-        create_user("admin_test", pwd, "admin")
-    except Exception:
-        pass
+        _validate_new_password(pwd)
+    except ValueError as e:
+        return (False, str(e))
     company = get_company_by_code("demo-agency")
     if not company:
         try:
@@ -34240,20 +35404,37 @@ def ensure_stg_test_users() -> tuple[bool, str]:
         except Exception:
             company = get_company_by_code("demo-agency")
     cid = _normalize_int_optional(company.get("id") if isinstance(company, dict) else None)
+    if cid and str(company.get("status") or COMPANY_STATUS_ACTIVE).strip().lower() != COMPANY_STATUS_ACTIVE:
+        cid = None
+    # 全員同じパスワードなのでハッシュは1回だけ作り、1回の INSERT でまとめて入れる
+    rows: list[tuple] = [("admin_test", "admin", None, "admin_test")]
     if cid:
-        for username, role, display_name in [
-            ("company_admin_test", "admin", "デモ会社 管理者"),
-            ("subadmin_test", "subadmin", "デモ会社 サブ管理者"),
-            ("user01", "user", "担当者01"),
-            ("user02", "user", "担当者02"),
-            ("user03", "user", "担当者03"),
-            ("user04", "user", "担当者04"),
-            ("user05", "user", "担当者05"),
-        ]:
-            try:
-                create_user(username, pwd, role, cid, display_name=display_name)
-            except Exception:
-                pass
+        rows += [
+            ("company_admin_test", "admin", cid, "デモ会社 管理者"),
+            ("subadmin_test", "subadmin", cid, "デモ会社 サブ管理者"),
+            ("user01", "user", cid, "担当者01"),
+            ("user02", "user", cid, "担当者02"),
+            ("user03", "user", cid, "担当者03"),
+            ("user04", "user", cid, "担当者04"),
+            ("user05", "user", cid, "担当者05"),
+        ]
+    pw_hash = hash_password(pwd)
+    values_sql = ", ".join(["(%s, %s, %s, TRUE, %s, %s, FALSE, NULL)"] * len(rows))
+    params = tuple(v for un, role, company_id, dn in rows for v in (un, pw_hash, role, company_id, dn))
+    try:
+        db_execute(
+            f"""
+            INSERT INTO users (username, password_hash, role, is_active, company_id, display_name, must_change_password, created_by_user_id)
+            VALUES {values_sql}
+            ON CONFLICT (username) DO NOTHING
+            """,
+            params,
+        )
+    except Exception as e:
+        return (False, sanitize_error_text(e))
+    if cid:
+        # 会社まで作れたときだけ完了扱い（DB未準備なら次回またやり直す）
+        _STG_SEEDED = True
     return (True, "stg test users seeded")
 
 
@@ -34541,6 +35722,118 @@ def _project_list_item_from_meta(meta: dict, fallback_project_id: str) -> dict:
     return item
 
 
+PROJECT_LIST_FETCH_WORKERS = max(1, _env_int("CVHB_PROJECT_LIST_FETCH_WORKERS", 4))
+_PROJECT_LIST_HEAD_BYTES = 24 * 1024
+
+
+def _project_list_json_head_get_str(head: str, key: str) -> str:
+    try:
+        m = re.search(r'"%s"\s*:\s*"((?:\\.|[^"])*)"' % re.escape(key), head)
+        if not m:
+            return ""
+        return json.loads('"' + m.group(1) + '"')
+    except Exception:
+        return ""
+
+
+def _read_project_list_meta(sftp, d: str) -> tuple[dict, bool]:
+    """案件1件分の一覧用メタを読む（meta.json が無い旧案件は project.json の先頭だけ読む）。
+
+    戻り値の2つ目は meta.json を読めてデコードできたか（False なら先頭読みの仮メタ）。
+    """
+    meta_text = ""
+    meta = {}
+    try:
+        meta_text = sftp_read_text(sftp, project_meta_path(d))
+    except Exception:
+        meta_text = ""
+    if meta_text:
+        try:
+            meta = _json_loads(meta_text)
+        except Exception:
+            meta = {}
+    if isinstance(meta, dict) and meta:
+        return meta, True
+
+    # 1.8.2: 一覧では full project load を禁止し、head 読みだけで最低限の meta を作る。
+    head = ""
+    try:
+        with _sftp_io_guard(sftp), sftp.open(project_json_path(d), "rb") as f:
+            head = f.read(_PROJECT_LIST_HEAD_BYTES).decode("utf-8", errors="ignore")
+    except Exception:
+        head = ""
+
+    return {
+        "project_id": _project_list_json_head_get_str(head, "project_id") or d,
+        "project_name": _project_list_json_head_get_str(head, "project_name") or "(legacy project)",
+        "updated_at": _project_list_json_head_get_str(head, "updated_at"),
+        "created_at": _project_list_json_head_get_str(head, "created_at"),
+        "updated_by": _project_list_json_head_get_str(head, "updated_by"),
+        "owner_company_id": None,
+        "owner_company_name": "",
+        "owner_company_code": "",
+        "assigned_user_ids": [],
+        "assigned_usernames": [],
+        "assigned_user_display_names": [],
+        "client_name": "",
+        "delivery_mode": DELIVERY_MODE_ZIP,
+        "maintenance_included": False,
+    }, False
+
+
+def _project_list_meta_stamp(sftp, d: str) -> Optional[tuple[int, int]]:
+    """一覧用メタの元ファイル（meta.json、無ければ project.json）の (mtime, size) を返す。"""
+    for path in (project_meta_path(d), project_json_path(d)):
+        try:
+            with _sftp_io_guard(sftp):
+                st = sftp.stat(path)
+        except Exception:
+            continue
+        return (int(st.st_mtime or 0), int(st.st_size or 0))
+    return None
+
+
+def _read_project_list_meta_cached(sftp, d: str) -> dict:
+    """stat だけ先に取り、前回と (mtime, size) が同じなら読み込み・JSONデコードを省く。"""
+    stamp = _project_list_meta_stamp(sftp, d)
+    cached = _PROJECT_INDEX_CACHE.get(d)
+    if stamp is not None and cached is not None and cached[0] == stamp:
+        return cached[1]
+    meta, decoded = _read_project_list_meta(sftp, d)
+    # 先頭読みの仮メタ（meta.json の一時的な読み込み失敗を含む）はキャッシュしない。
+    # 残すと meta.json が変わるまで旧案件扱い・担当者なしのままになり、企業ユーザーから見えなくなる。
+    if decoded and stamp is not None:
+        _PROJECT_INDEX_CACHE[d] = (stamp, meta)
+    else:
+        _PROJECT_INDEX_CACHE.pop(d, None)
+    return meta
+
+
+def _read_project_list_metas(dirs: list[str]) -> list[tuple[str, dict]]:
+    """案件ごとのメタ読み込みは往復待ちが中心なので、少数のスレッドで並行して読む。
+
+    スレッドごとに SFTP チャネルを1本開き（接続は使い回し）、担当分の案件をまとめて読む。
+    """
+    dirs = list(dirs or [])
+    workers = min(int(PROJECT_LIST_FETCH_WORKERS), len(dirs))
+    # 削除された案件のメタはキャッシュから落とす
+    for stale in _PROJECT_INDEX_CACHE.keys() - set(dirs):
+        _PROJECT_INDEX_CACHE.pop(stale, None)
+
+    def _read_group(group: list[str]) -> list[tuple[str, dict]]:
+        with sftp_client() as sftp:
+            return [(d, _read_project_list_meta_cached(sftp, d)) for d in group]
+
+    if workers <= 1:
+        return _read_group(dirs) if dirs else []
+    groups = [dirs[i::workers] for i in range(workers)]
+    out: list[tuple[str, dict]] = []
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for part in ex.map(_read_group, groups):
+            out.extend(part)
+    return out
+
+
 def list_projects_from_sftp(user: Optional[User] = None) -> list[dict]:
     viewer = user or current_user()
     if HELP_MODE:
@@ -34558,57 +35851,13 @@ def list_projects_from_sftp(user: Optional[User] = None) -> list[dict]:
         try:
             with sftp_client() as sftp:
                 dirs = sftp_list_dirs(sftp, SFTP_PROJECTS_DIR)
-                for d in dirs:
-                    meta_text = ""
-                    meta = {}
-                    try:
-                        meta_text = sftp_read_text(sftp, project_meta_path(d))
-                    except Exception:
-                        meta_text = ""
-                    if meta_text:
-                        try:
-                            meta = json.loads(meta_text)
-                        except Exception:
-                            meta = {}
-                    if not isinstance(meta, dict) or not meta:
-                        # 1.8.2: 一覧では full project load を禁止し、head 読みだけで最低限の meta を作る。
-                        HEAD_BYTES = 24 * 1024
-
-                        def _json_head_get_str(head: str, key: str) -> str:
-                            try:
-                                m = re.search(r'"%s"\s*:\s*"((?:\\.|[^"])*)"' % re.escape(key), head)
-                                if not m:
-                                    return ""
-                                return json.loads('"' + m.group(1) + '"')
-                            except Exception:
-                                return ""
-
-                        head = ""
-                        try:
-                            with sftp.open(project_json_path(d), "rb") as f:
-                                head = f.read(HEAD_BYTES).decode("utf-8", errors="ignore")
-                        except Exception:
-                            head = ""
-
-                        meta = {
-                            "project_id": _json_head_get_str(head, "project_id") or d,
-                            "project_name": _json_head_get_str(head, "project_name") or "(legacy project)",
-                            "updated_at": _json_head_get_str(head, "updated_at"),
-                            "created_at": _json_head_get_str(head, "created_at"),
-                            "updated_by": _json_head_get_str(head, "updated_by"),
-                            "owner_company_id": None,
-                            "owner_company_name": "",
-                            "owner_company_code": "",
-                            "assigned_user_ids": [],
-                            "assigned_usernames": [],
-                            "assigned_user_display_names": [],
-                            "client_name": "",
-                            "delivery_mode": DELIVERY_MODE_ZIP,
-                            "maintenance_included": False,
-                        }
-                    full_items.append(_project_list_item_from_meta(meta, d))
+            full_items = [
+                _project_list_item_from_meta(meta, d)
+                for d, meta in _read_project_list_metas(dirs)
+            ]
             try:
-                full_items.sort(key=lambda x: str(x.get("updated_at") or ""), reverse=True)
+                # _project_list_item_from_meta が updated_at を必ず str で入れるので itemgetter で足りる
+                full_items.sort(key=itemgetter("updated_at"), reverse=True)
             except Exception:
                 pass
             _project_list_cache_put(full_items)
@@ -34665,6 +35914,7 @@ def get_current_project(user: Optional[User]) -> Optional[dict]:
     shared_cached = _project_load_cache_get(pid)
     if isinstance(shared_cached, dict):
         if user_can_access_project(user, shared_cached):
+            PROJECT_CACHE.mark_clean(user.id)  # 別案件のキャッシュを置き換えるので未保存印も外す
             PROJECT_CACHE[user.id] = shared_cached
             try:
                 app.storage.user["current_project_name"] = shared_cached.get("project_name", "")
@@ -34679,6 +35929,7 @@ def get_current_project(user: Optional[User]) -> Optional[dict]:
     except Exception:
         clear_current_project(user)
         return None
+    PROJECT_CACHE.mark_clean(user.id)
     PROJECT_CACHE[user.id] = project_obj
     try:
         app.storage.user["current_project_name"] = project_obj.get("project_name", "")
@@ -34704,7 +35955,7 @@ def delete_project_from_sftp(project_id: str, user: Optional[User]) -> None:
             raise ValueError("project_id is empty")
         HELP_PROJECT_STORE.pop(pid, None)
         _project_load_cache_invalidate(pid)
-        _project_list_cache_invalidate()
+        _project_list_cache_invalidate(pid)
         try:
             if str(app.storage.user.get("current_project_id") or "").strip() == pid:
                 clear_current_project(user)
@@ -35056,7 +36307,7 @@ def account_page_v175():
             new_pw_input = ui.input("新しいパスワード", password=True, password_toggle_button=True).props("outlined").classes("w-full q-mt-sm")
             new_pw2_input = ui.input("新しいパスワード（確認）", password=True, password_toggle_button=True).props("outlined").classes("w-full q-mt-sm")
 
-            def _save_account() -> None:
+            async def _save_account() -> None:
                 new_pw = str(new_pw_input.value or "")
                 new_pw2 = str(new_pw2_input.value or "")
                 if password_change_required and not new_pw:
@@ -35067,7 +36318,8 @@ def account_page_v175():
                         ui.notify("新しいパスワードが一致しません", type="negative")
                         return
                 try:
-                    updated = update_own_account(
+                    updated = await asyncio.to_thread(
+                        update_own_account,
                         u,
                         display_name=str(display_name_input.value or ""),
                         current_password=str(current_pw_input.value or ""),
@@ -35298,9 +36550,10 @@ def tenant_admin_page_v175():
                     with ui.row().classes("q-gutter-sm q-mt-sm"):
                         ui.button("初期パスワード自動生成", on_click=lambda: setattr(member_password_input, 'value', _generate_temporary_password())).props("outline")
 
-                    def _issue_member() -> None:
+                    async def _issue_member() -> None:
                         try:
-                            create_user(
+                            await asyncio.to_thread(
+                                create_user,
                                 str(member_username_input.value or ""),
                                 str(member_password_input.value or ""),
                                 str(member_role_input.value or role_options[0]),